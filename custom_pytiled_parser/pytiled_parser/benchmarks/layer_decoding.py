@@ -0,0 +1,139 @@
+"""Benchmark tile layer decoding against the layer test fixtures.
+
+Each fixture layer is decoded as-is, and again after being tiled up into a larger
+layer encoded the same way, so the per-tile cost is visible next to the fixed
+per-call cost. The previous byte-at-a-time decoder is kept here as a baseline.
+
+Run from the project root:
+
+    python benchmarks/layer_decoding.py [--size 256] [--number 20]
+"""
+import argparse
+import base64
+import gzip
+import timeit
+import xml.etree.ElementTree as etree
+import zlib
+from pathlib import Path
+from typing import Callable, List
+
+from pytiled_parser.parsers.tmx.layer import (
+    _convert_raw_tile_layer_data,
+    _decode_tile_layer_data,
+)
+
+LAYER_TESTS = Path(__file__).parent.parent / "tests" / "test_data" / "layer_tests"
+
+FIXTURES = {
+    "base64": LAYER_TESTS / "b64",
+    "zlib": LAYER_TESTS / "b64_zlib",
+    "gzip": LAYER_TESTS / "b64_gzip",
+    "csv": LAYER_TESTS / "all_layer_types",
+}
+
+
+def _legacy_decode(data: str, compression: str, layer_width: int) -> List[List[int]]:
+    """The decoder pytiled_parser used before TileGrid, kept as a baseline."""
+    unzipped_data = base64.b64decode(data)
+    if compression == "zlib":
+        unzipped_data = zlib.decompress(unzipped_data)
+    elif compression == "gzip":
+        unzipped_data = gzip.decompress(unzipped_data)
+
+    tile_ids: List[int] = []
+    byte_count = 0
+    int_value = 0
+    for byte in unzipped_data:
+        int_value += byte << (byte_count * 8)
+        byte_count += 1
+        if not byte_count % 4:
+            byte_count = 0
+            tile_ids.append(int_value)
+            int_value = 0
+
+    return _legacy_convert(tile_ids, layer_width)
+
+
+def _legacy_convert(data: List[int], layer_width: int) -> List[List[int]]:
+    tile_grid: List[List[int]] = [[]]
+    column_count = 0
+    row_count = 0
+    for item in data:
+        column_count += 1
+        tile_grid[row_count].append(item)
+        if not column_count % layer_width and column_count < len(data):
+            row_count += 1
+            tile_grid.append([])
+    return tile_grid
+
+
+def _encode(tile_ids: List[int], compression: str) -> str:
+    raw = b"".join(tile_id.to_bytes(4, "little") for tile_id in tile_ids)
+    if compression == "zlib":
+        raw = zlib.compress(raw)
+    elif compression == "gzip":
+        raw = gzip.compress(raw)
+    return base64.b64encode(raw).decode()
+
+
+def _tile_up(rows: List[List[int]], size: int) -> List[int]:
+    """Repeat the fixture grid to fill a size x size layer."""
+    height = len(rows)
+    width = len(rows[0])
+    return [rows[y % height][x % width] for y in range(size) for x in range(size)]
+
+
+def _time(func: Callable[[], object], number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=3)) / number * 1000
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--size", type=int, default=256, help="Large layer size")
+    arg_parser.add_argument("--number", type=int, default=20, help="Runs per timing")
+    args = arg_parser.parse_args()
+
+    print(f"{'fixture':<10}{'tiles':>8}{'legacy ms':>12}{'grid ms':>10}{'speedup':>9}")
+    for name, fixture in FIXTURES.items():
+        with open(fixture / "map.tmx") as map_file:
+            raw_layer = etree.parse(map_file).getroot().find("./layer")
+        data_element = raw_layer.find("data")  # type: ignore
+        compression = data_element.attrib.get("compression", "")  # type: ignore
+        width = int(raw_layer.attrib["width"])  # type: ignore
+        text = data_element.text  # type: ignore
+
+        if name == "csv":
+            rows = _convert_raw_tile_layer_data(
+                [int(v) for v in text.split(",")], width
+            ).tolist()
+        else:
+            rows = _decode_tile_layer_data(text, compression, width).tolist()
+
+        for size in (width, args.size):
+            tile_ids = _tile_up(rows, size)
+            if name == "csv":
+                text = ",".join(str(tile_id) for tile_id in tile_ids)
+                legacy = lambda: _legacy_convert(  # noqa: E731
+                    [int(v) for v in text.split(",")], size
+                )
+                current = lambda: _convert_raw_tile_layer_data(  # noqa: E731
+                    [int(v) for v in text.split(",")], size
+                )
+            else:
+                text = _encode(tile_ids, compression)
+                legacy = lambda: _legacy_decode(text, compression, size)  # noqa: E731
+                current = lambda: _decode_tile_layer_data(  # noqa: E731
+                    text, compression, size
+                )
+
+            assert current() == legacy()
+            legacy_ms = _time(legacy, args.number)
+            current_ms = _time(current, args.number)
+            print(
+                f"{name:<10}{len(tile_ids):>8}{legacy_ms:>12.3f}"
+                f"{current_ms:>10.3f}{legacy_ms / current_ms:>8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -13,7 +13,16 @@ PyTiled Parser is not tied to any particular graphics library or game engine.
 
 from .common_types import Color, OrderedPair, Size
 from .exception import UnknownFormat
-from .layer import Chunk, ImageLayer, Layer, LayerGroup, ObjectLayer, TileLayer
+from .layer import (
+    Chunk,
+    ImageLayer,
+    Layer,
+    LayerGroup,
+    LazyTileGrid,
+    ObjectLayer,
+    TileGrid,
+    TileLayer,
+)
 from .parser import parse_map, parse_world
 from .properties import Properties, Property
 from .tiled_map import TiledMap
@@ -9,8 +9,11 @@ For more information about Layers, see [Tiled's Manual](https://doc.mapeditor.or
 
 # pylint: disable=too-few-public-methods
 
+import importlib.util
+import sys
+from array import array
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import Any, Callable, Iterator, List, Optional, Sequence, Union, overload
 
 import attr
 
@@ -18,6 +21,14 @@ from pytiled_parser.common_types import Color, OrderedPair, Size
 from pytiled_parser.properties import Properties
 from pytiled_parser.tiled_object import TiledObject
 
+# NumPy is never required, but when it's installed `TileGrid.to_numpy` can hand
+# out an ndarray that shares memory with the decoded layer data.
+numpy_spec = importlib.util.find_spec("numpy")
+if numpy_spec:  # pragma: no cover
+    import numpy
+else:
+    numpy = None
+
 
 @attr.s(repr=True, str=True, auto_attribs=True, kw_only=True)
 class Layer:
@@ -69,7 +80,194 @@ class Layer:
     tint_color: Optional[Color] = None
 
 
-TileLayerGrid = List[List[int]]
+class TileGrid(Sequence[List[int]]):
+    """Row-major grid of global tile IDs backed by a single flat uint32 buffer.
+
+    The parsers decode tile data straight into this buffer, without building a
+    Python int per byte or a list per row. The buffer is exposed as a two
+    dimensional ``memoryview`` through `view`, and as a NumPy array through
+    `to_numpy` when NumPy is installed.
+
+    For compatibility the grid also behaves like the ``List[List[int]]`` that
+    pytiled_parser used to return: indexing, iterating, ``len`` and comparing
+    against nested lists all work. The nested lists are only built the first
+    time they are needed.
+
+    Attributes:
+        width: Number of columns in the grid.
+        height: Number of rows in the grid.
+    """
+
+    def __init__(self, values: Union[memoryview, array], width: int):
+        self._values = memoryview(values)
+        self.width = width
+        self.height = -(-len(self._values) // width) if width else 0
+        self._rows: Optional[List[List[int]]] = None
+
+    @classmethod
+    def from_bytes(cls, data: bytes, width: int) -> "TileGrid":
+        """Create a grid from little-endian uint32 tile data.
+
+        On little-endian machines the grid keeps a view of ``data`` and no copy is
+        made.
+
+        Args:
+            data: Raw, decompressed layer data as stored by Tiled.
+            width: Width of the layer in tiles.
+
+        Returns:
+            TileGrid: A grid viewing the decoded data.
+        """
+        if sys.byteorder == "little":
+            return cls(memoryview(data).cast("I"), width)
+
+        values = array("I")  # pragma: no cover
+        values.frombytes(data)  # pragma: no cover
+        values.byteswap()  # pragma: no cover
+        return cls(values, width)  # pragma: no cover
+
+    @classmethod
+    def from_list(cls, data: Sequence[int], width: int) -> "TileGrid":
+        """Create a grid from a flat sequence of global tile IDs.
+
+        Args:
+            data: Flat, row-major list of global tile IDs.
+            width: Width of the layer in tiles.
+
+        Returns:
+            TileGrid: A grid holding the data.
+        """
+        return cls(array("I", data), width)
+
+    @property
+    def values(self) -> memoryview:
+        """Flat, row-major view of every global tile ID in the grid."""
+        return self._values
+
+    @property
+    def view(self) -> memoryview:
+        """Two dimensional view of the grid, indexed as ``view[row, column]``.
+
+        Falls back to the flat view if the data doesn't fill a whole number of rows.
+        """
+        if len(self._values) != self.width * self.height or not self.width:
+            return self._values
+        return self._values.cast("B").cast(
+            self._values.format, (self.height, self.width)
+        )
+
+    def to_numpy(self) -> Any:
+        """Return the grid as a ``(height, width)`` NumPy array sharing its memory.
+
+        Raises:
+            ImportError: If NumPy is not installed.
+        """
+        if numpy is None:
+            raise ImportError("NumPy is required for TileGrid.to_numpy().")
+        return numpy.frombuffer(self._values, dtype=numpy.uint32).reshape(
+            self.height, self.width
+        )
+
+    def tolist(self) -> List[List[int]]:
+        """Return the grid as a nested list, the same object on every call."""
+        if self._rows is None:
+            flat = self._values.tolist()
+            width = self.width or len(flat)
+            self._rows = [flat[i : i + width] for i in range(0, len(flat), width)]
+            if not self._rows:
+                self._rows = [[]]
+        return self._rows
+
+    @overload
+    def __getitem__(self, index: int) -> List[int]:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[List[int]]:
+        ...
+
+    def __getitem__(self, index):
+        return self.tolist()[index]
+
+    def __len__(self) -> int:
+        return len(self.tolist())
+
+    def __iter__(self) -> Iterator[List[int]]:
+        return iter(self.tolist())
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, TileGrid):
+            return self.width == other.width and self._values == other._values
+        if isinstance(other, list):
+            return self.tolist() == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"TileGrid(width={self.width}, height={self.height})"
+
+    def __reduce_ex__(self, protocol):
+        # With pickle protocol 5 the tile data can be stored out-of-band, which lets
+        # the unpickled grid view a buffer (such as a memory-mapped file) directly.
+        # The data is pickled in native byte order.
+        if protocol >= 5:
+            from pickle import PickleBuffer
+
+            return _tile_grid_from_buffer, (PickleBuffer(self._values), self.width)
+        return _tile_grid_from_buffer, (self._values.tobytes(), self.width)
+
+
+def _tile_grid_from_buffer(buffer: Any, width: int) -> TileGrid:
+    """Rebuild a pickled TileGrid as a view of ``buffer``."""
+    return TileGrid(memoryview(buffer).cast("B").cast("I"), width)
+
+
+class LazyTileGrid(TileGrid):
+    """TileGrid which only decodes its tile data the first time it is used.
+
+    Infinite maps can have many more chunks than are ever near the camera at once,
+    so the parsers create chunk data as lazy grids instead of decoding every chunk
+    up front. Once decoded, the data can be dropped again with `release`, and it is
+    decoded again the next time it is used.
+
+    Attributes:
+        width: Number of columns in the grid.
+        height: Number of rows in the grid.
+    """
+
+    def __init__(self, decode: Callable[[], TileGrid], width: int, height: int):
+        self._decode = decode
+        self._grid: Optional[TileGrid] = None
+        self.width = width
+        self.height = height
+        self._rows = None
+
+    @property  # type: ignore[override]
+    def _values(self) -> memoryview:
+        if self._grid is None:
+            self._grid = self._decode()
+        return self._grid.values
+
+    @property
+    def decoded(self) -> bool:
+        """Whether the tile data is currently decoded."""
+        return self._grid is not None
+
+    def release(self) -> None:
+        """Drop the decoded tile data, keeping what is needed to decode it again."""
+        self._grid = None
+        self._rows = None
+
+    def __reduce_ex__(self, protocol):
+        # Pickle the encoded data and how to decode it, not the decoded tiles, so an
+        # unpickled grid is still lazy. The decode function must be picklable, like
+        # the partials the parsers create.
+        return LazyTileGrid, (self._decode, self.width, self.height)
+
+    def __repr__(self) -> str:
+        return f"LazyTileGrid(width={self.width}, height={self.height})"
+
+
+TileLayerGrid = Union[List[List[int]], TileGrid]
 
 
 @attr.s(auto_attribs=True)
@@ -91,7 +289,7 @@ class Chunk:
 
     coordinates: OrderedPair
     size: Size
-    data: List[List[int]]
+    data: TileLayerGrid
 
 
 # The tile data for one layer.
@@ -114,11 +312,12 @@ class TileLayer(Layer):
     Attributes:
         chunks: List of chunks (only populated for infinite maps)
         data: A two dimensional array of integers representing the global
-        tile IDs for the layer (only populaed for non-infinite maps)
+        tile IDs for the layer (only populaed for non-infinite maps). The parsers
+        return a `TileGrid`, which can also be used as a nested list.
     """
 
     chunks: Optional[List[Chunk]] = None
-    data: Optional[List[List[int]]] = None
+    data: Optional[TileLayerGrid] = None
 
 
 @attr.s(auto_attribs=True, kw_only=True)
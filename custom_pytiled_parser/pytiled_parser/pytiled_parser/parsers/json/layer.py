@@ -4,6 +4,7 @@ import base64
 import gzip
 import importlib.util
 import zlib
+from functools import partial
 from pathlib import Path
 from typing import Any, List, Optional, Union, cast
 
@@ -15,7 +16,9 @@ from pytiled_parser.layer import (
     ImageLayer,
     Layer,
     LayerGroup,
+    LazyTileGrid,
     ObjectLayer,
+    TileGrid,
     TileLayer,
 )
 from pytiled_parser.parsers.json.properties import RawProperty
@@ -92,33 +95,22 @@ RawLayer.__doc__ = """
 """
 
 
-def _convert_raw_tile_layer_data(data: List[int], layer_width: int) -> List[List[int]]:
-    """Convert raw layer data into a nested lit based on the layer width
+def _convert_raw_tile_layer_data(data: List[int], layer_width: int) -> TileGrid:
+    """Convert raw layer data into a TileGrid based on the layer width
 
     Args:
         data: The data to convert
         layer_width: Width of the layer
 
     Returns:
-        List[List[int]]: A nested list containing the converted data
+        TileGrid: A grid containing the converted data
     """
-    tile_grid: List[List[int]] = [[]]
-
-    column_count = 0
-    row_count = 0
-    for item in data:
-        column_count += 1
-        tile_grid[row_count].append(item)
-        if not column_count % layer_width and column_count < len(data):
-            row_count += 1
-            tile_grid.append([])
-
-    return tile_grid
+    return TileGrid.from_list(data, layer_width)
 
 
 def _decode_tile_layer_data(
     data: str, compression: str, layer_width: int
-) -> List[List[int]]:
+) -> TileGrid:
     """Decode Base64 Encoded tile data. Optionally supports gzip and zlib compression.
 
     Args:
@@ -126,7 +118,7 @@ def _decode_tile_layer_data(
         compression: Either zlib, gzip, or empty. If empty no decompression is done.
 
     Returns:
-        List[List[int]]: A nested list containing the decoded data
+        TileGrid: A grid viewing the decoded data
 
     Raises:
         ValueError: For an unsupported compression type.
@@ -147,21 +139,7 @@ def _decode_tile_layer_data(
     else:
         unzipped_data = unencoded_data
 
-    tile_grid: List[int] = []
-
-    byte_count = 0
-    int_count = 0
-    int_value = 0
-    for byte in unzipped_data:
-        int_value += byte << (byte_count * 8)
-        byte_count += 1
-        if not byte_count % 4:
-            byte_count = 0
-            int_count += 1
-            tile_grid.append(int_value)
-            int_value = 0
-
-    return _convert_raw_tile_layer_data(tile_grid, layer_width)
+    return TileGrid.from_bytes(unzipped_data, layer_width)
 
 
 def _parse_chunk(
@@ -171,6 +149,8 @@ def _parse_chunk(
 ) -> Chunk:
     """Parse the raw_chunk to a Chunk.
 
+    The chunk's data is a LazyTileGrid, which is only decoded when it is first used.
+
     Args:
         raw_chunk: RawChunk to be parsed to a Chunk
         encoding: Encoding type. ("base64" or None)
@@ -182,18 +162,21 @@ def _parse_chunk(
     if encoding == "base64":
         assert isinstance(compression, str)
         assert isinstance(raw_chunk["data"], str)
-        data = _decode_tile_layer_data(
-            raw_chunk["data"], compression, raw_chunk["width"]
+        if compression == "zstd" and zstd is None:
+            # Report the missing zstd support now, not when the chunk is used
+            _decode_tile_layer_data("", compression, raw_chunk["width"])
+        decode = partial(
+            _decode_tile_layer_data, raw_chunk["data"], compression, raw_chunk["width"]
         )
     else:
-        data = _convert_raw_tile_layer_data(
-            raw_chunk["data"], raw_chunk["width"]  # type: ignore
+        decode = partial(
+            _convert_raw_tile_layer_data, raw_chunk["data"], raw_chunk["width"]  # type: ignore
         )
 
     chunk = Chunk(
         coordinates=OrderedPair(raw_chunk["x"], raw_chunk["y"]),
         size=Size(raw_chunk["width"], raw_chunk["height"]),
-        data=data,
+        data=LazyTileGrid(decode, raw_chunk["width"], raw_chunk["height"]),
     )
 
     return chunk
@@ -15,7 +15,7 @@ from pytiled_parser.parsers.json.tileset import RawTileSet
 from pytiled_parser.parsers.json.tileset import parse as parse_json_tileset
 from pytiled_parser.parsers.tmx.tileset import parse as parse_tmx_tileset
 from pytiled_parser.tiled_map import TiledMap, TilesetDict
-from pytiled_parser.util import check_format, parse_color
+from pytiled_parser.util import index_objects, load_object_tileset, parse_color
 
 RawTilesetMapping = TypedDict("RawTilesetMapping", {"firstgid": int, "source": str})
 
@@ -76,27 +76,25 @@ def parse(file: Path) -> TiledMap:
         if raw_tileset.get("source") is not None:
             # Is an external Tileset
             tileset_path = Path(parent_dir / raw_tileset["source"])
-            parser = check_format(tileset_path)
-            with open(tileset_path) as raw_tileset_file:
-                if parser == "tmx":
-                    raw_tileset_external = etree.parse(raw_tileset_file).getroot()
+            try:
+                raw_tileset_external = load_object_tileset(tileset_path)
+                if isinstance(raw_tileset_external, etree.Element):
                     tilesets[raw_tileset["firstgid"]] = parse_tmx_tileset(
                         raw_tileset_external,
                         raw_tileset["firstgid"],
                         external_path=tileset_path.parent,
                     )
                 else:
-                    try:
-                        tilesets[raw_tileset["firstgid"]] = parse_json_tileset(
-                            json.load(raw_tileset_file),
-                            raw_tileset["firstgid"],
-                            external_path=tileset_path.parent,
-                        )
-                    except ValueError:
-                        raise UnknownFormat(
-                            "Unknown Tileset Format, please use either the TSX or JSON format. "
-                            "This message could also mean your tileset file is invalid or corrupted."
-                        )
+                    tilesets[raw_tileset["firstgid"]] = parse_json_tileset(
+                        raw_tileset_external,
+                        raw_tileset["firstgid"],
+                        external_path=tileset_path.parent,
+                    )
+            except ValueError:
+                raise UnknownFormat(
+                    "Unknown Tileset Format, please use either the TSX or JSON format. "
+                    "This message could also mean your tileset file is invalid or corrupted."
+                )
         else:
             # Is an embedded Tileset
             raw_tileset = cast(RawTileSet, raw_tileset)
@@ -198,4 +196,6 @@ def parse(file: Path) -> TiledMap:
 
     map_.parallax_origin = OrderedPair(_parallax_origin_x, _parallax_origin_y)
 
+    map_.objects = index_objects(map_.layers)
+
     return map_
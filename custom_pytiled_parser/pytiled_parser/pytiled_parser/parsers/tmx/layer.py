@@ -5,6 +5,7 @@ import gzip
 import importlib.util
 import xml.etree.ElementTree as etree
 import zlib
+from functools import partial
 from pathlib import Path
 from typing import List, Optional
 
@@ -14,7 +15,9 @@ from pytiled_parser.layer import (
     ImageLayer,
     Layer,
     LayerGroup,
+    LazyTileGrid,
     ObjectLayer,
+    TileGrid,
     TileLayer,
 )
 from pytiled_parser.parsers.tmx.properties import parse as parse_properties
@@ -37,33 +40,22 @@ else:
     zstd = None
 
 
-def _convert_raw_tile_layer_data(data: List[int], layer_width: int) -> List[List[int]]:
-    """Convert raw layer data into a nested lit based on the layer width
+def _convert_raw_tile_layer_data(data: List[int], layer_width: int) -> TileGrid:
+    """Convert raw layer data into a TileGrid based on the layer width
 
     Args:
         data: The data to convert
         layer_width: Width of the layer
 
     Returns:
-        List[List[int]]: A nested list containing the converted data
+        TileGrid: A grid containing the converted data
     """
-    tile_grid: List[List[int]] = [[]]
-
-    column_count = 0
-    row_count = 0
-    for item in data:
-        column_count += 1
-        tile_grid[row_count].append(item)
-        if not column_count % layer_width and column_count < len(data):
-            row_count += 1
-            tile_grid.append([])
-
-    return tile_grid
+    return TileGrid.from_list(data, layer_width)
 
 
 def _decode_tile_layer_data(
     data: str, compression: str, layer_width: int
-) -> List[List[int]]:
+) -> TileGrid:
     """Decode Base64 Encoded tile data. Optionally supports gzip and zlib compression.
 
     Args:
@@ -71,7 +63,7 @@ def _decode_tile_layer_data(
         compression: Either zlib, gzip, or empty. If empty no decompression is done.
 
     Returns:
-        List[List[int]]: A nested list containing the decoded data
+        TileGrid: A grid viewing the decoded data
 
     Raises:
         ValueError: For an unsupported compression type.
@@ -92,21 +84,7 @@ def _decode_tile_layer_data(
     else:
         unzipped_data = unencoded_data
 
-    tile_grid: List[int] = []
-
-    byte_count = 0
-    int_count = 0
-    int_value = 0
-    for byte in unzipped_data:
-        int_value += byte << (byte_count * 8)
-        byte_count += 1
-        if not byte_count % 4:
-            byte_count = 0
-            int_count += 1
-            tile_grid.append(int_value)
-            int_value = 0
-
-    return _convert_raw_tile_layer_data(tile_grid, layer_width)
+    return TileGrid.from_bytes(unzipped_data, layer_width)
 
 
 def _parse_chunk(
@@ -116,6 +94,8 @@ def _parse_chunk(
 ) -> Chunk:
     """Parse the raw_chunk to a Chunk.
 
+    The chunk's data is a LazyTileGrid, which is only decoded when it is first used.
+
     Args:
         raw_chunk: XML Element to be parsed to a Chunk
         encoding: Encoding type. ("base64" or None)
@@ -124,21 +104,27 @@ def _parse_chunk(
     Returns:
         Chunk: The Chunk created from the raw_chunk
     """
+    width = int(raw_chunk.attrib["width"])
+    height = int(raw_chunk.attrib["height"])
     if encoding == "base64":
         assert isinstance(compression, str)
-        data = _decode_tile_layer_data(
-            raw_chunk.text, compression, int(raw_chunk.attrib["width"])  # type: ignore
+        if compression == "zstd" and zstd is None:
+            # Report the missing zstd support now, not when the chunk is used
+            _decode_tile_layer_data("", compression, width)
+        decode = partial(
+            _decode_tile_layer_data, raw_chunk.text, compression, width  # type: ignore
         )
     else:
-        data = _convert_raw_tile_layer_data(
+        decode = partial(
+            _convert_raw_tile_layer_data,
             [int(v.strip()) for v in raw_chunk.text.split(",")],  # type: ignore
-            int(raw_chunk.attrib["width"]),
+            width,
         )
 
     return Chunk(
         coordinates=OrderedPair(int(raw_chunk.attrib["x"]), int(raw_chunk.attrib["y"])),
-        size=Size(int(raw_chunk.attrib["width"]), int(raw_chunk.attrib["height"])),
-        data=data,
+        size=Size(width, height),
+        data=LazyTileGrid(decode, width, height),
     )
 
 
@@ -3,7 +3,6 @@ from pathlib import Path
 
 from pytiled_parser.properties import Properties, Property
 from pytiled_parser.util import parse_color
-import pytiled_parser
 
 # ---- Changed ----
 class ObjectID:
@@ -15,7 +14,7 @@ class ObjectID:
         if self.tilemap is None:
             raise Exception("tilemap have not been specified yet.")
         else:
-            return _get_object_by_id(self.tilemap, self.id)
+            return self.tilemap.objects.get(self.id)
 # ---- Changed End ----
 
 def parse(raw_properties: etree.Element) -> Properties:
@@ -52,13 +51,3 @@ def parse(raw_properties: etree.Element) -> Properties:
         final[raw_property.attrib["name"]] = value
 
     return final
-
-# ---- Changed ----
-def _get_object_by_id(tilemap, tile_id):
-    for layer in tilemap.layers:
-        if isinstance(layer, pytiled_parser.ObjectLayer):
-            for cur_object in layer.tiled_objects:
-                if cur_object.id == tile_id:
-                    return cur_object
-    return None
-# ---- Changed End ----
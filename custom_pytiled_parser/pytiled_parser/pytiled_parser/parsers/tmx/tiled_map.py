@@ -1,71 +1,116 @@
-import json
 import xml.etree.ElementTree as etree
 from pathlib import Path
+from typing import Iterator, List
 
 from pytiled_parser.common_types import OrderedPair, Size
 from pytiled_parser.exception import UnknownFormat
+from pytiled_parser.layer import Layer, LayerGroup, ObjectLayer
 from pytiled_parser.parsers.json.tileset import parse as parse_json_tileset
 from pytiled_parser.parsers.tmx.layer import parse as parse_layer
 from pytiled_parser.parsers.tmx.properties import parse as parse_properties
 from pytiled_parser.parsers.tmx.tileset import parse as parse_tmx_tileset
 from pytiled_parser.tiled_map import TiledMap, TilesetDict
-from pytiled_parser.util import check_format, parse_color
+from pytiled_parser.tileset import Tileset
+from pytiled_parser.util import index_objects, load_object_tileset, parse_color
 # ---- Changed ----
 from pytiled_parser.parsers.tmx.properties import ObjectID
 # ---- Changed End ----
 
 
+# ---- Changed ----
+LAYER_TAGS = ("layer", "objectgroup", "imagelayer", "group")
+
+
+def _parse_tileset(raw_tileset: etree.Element, parent_dir: Path) -> Tileset:
+    """Parse a tileset element of a map, loading it from its file if it is external.
+
+    Args:
+        raw_tileset: The tileset element.
+        parent_dir: The directory that the map file is in.
+
+    Returns:
+        Tileset: The parsed Tileset.
+    """
+    firstgid = int(raw_tileset.attrib["firstgid"])
+    if raw_tileset.attrib.get("source") is None:
+        # Is an embedded Tileset
+        return parse_tmx_tileset(raw_tileset, firstgid)
+
+    # Is an external Tileset
+    tileset_path = Path(parent_dir / raw_tileset.attrib["source"])
+    raw_tileset_external = load_object_tileset(tileset_path)
+    if isinstance(raw_tileset_external, etree.Element):
+        return parse_tmx_tileset(
+            raw_tileset_external, firstgid, external_path=tileset_path.parent
+        )
+    elif isinstance(raw_tileset_external, dict):
+        return parse_json_tileset(
+            raw_tileset_external, firstgid, external_path=tileset_path.parent
+        )
+    raise UnknownFormat(
+        "Unkown Tileset format, please use either the TSX or JSON format."
+    )
+
+
+def _iter_object_layers(layers: List[Layer]) -> Iterator[ObjectLayer]:
+    """Iterate over the object layers, including the ones inside layer groups."""
+    for layer in layers:
+        if isinstance(layer, ObjectLayer):
+            yield layer
+        elif isinstance(layer, LayerGroup):
+            yield from _iter_object_layers(layer.layers)
+
+
 def parse(file: Path) -> TiledMap:
     """Parse the raw Tiled map into a pytiled_parser type.
 
+    The map is read in a single pass with iterparse. Each tileset, layer and the map
+    properties are parsed as soon as their element ends, and the element is then
+    removed from the tree, so only one top level element is held in memory at a time.
+    Layers inside a group are parsed once, as part of their group.
+
     Args:
         file: Path to the map file.
 
     Returns:
         TiledMap: A parsed TiledMap.
     """
-    with open(file) as map_file:
-        raw_map = etree.parse(map_file).getroot()
-
     parent_dir = file.parent
 
-    raw_tilesets = raw_map.findall("./tileset")
+    raw_map = None
     tilesets: TilesetDict = {}
-
-    for raw_tileset in raw_tilesets:
-        if raw_tileset.attrib.get("source") is not None:
-            # Is an external Tileset
-            tileset_path = Path(parent_dir / raw_tileset.attrib["source"])
-            parser = check_format(tileset_path)
-            with open(tileset_path) as tileset_file:
-                if parser == "tmx":
-                    raw_tileset_external = etree.parse(tileset_file).getroot()
-                    tilesets[int(raw_tileset.attrib["firstgid"])] = parse_tmx_tileset(
-                        raw_tileset_external,
-                        int(raw_tileset.attrib["firstgid"]),
-                        external_path=tileset_path.parent,
-                    )
-                elif parser == "json":
-                    tilesets[int(raw_tileset.attrib["firstgid"])] = parse_json_tileset(
-                        json.load(tileset_file),
-                        int(raw_tileset.attrib["firstgid"]),
-                        external_path=tileset_path.parent,
-                    )
-                else:
-                    raise UnknownFormat(
-                        "Unkown Tileset format, please use either the TSX or JSON format."
-                    )
-
-        else:
-            # Is an embedded Tileset
-            tilesets[int(raw_tileset.attrib["firstgid"])] = parse_tmx_tileset(
-                raw_tileset, int(raw_tileset.attrib["firstgid"])
-            )
-
-    layers = []
-    for element in raw_map.iter():
-        if element.tag in ["layer", "objectgroup", "imagelayer", "group"]:
-            layers.append(parse_layer(element, parent_dir))
+    layers: List[Layer] = []
+    properties_element = None
+    depth = 0
+
+    with open(file, "rb") as map_file:
+        for event, element in etree.iterparse(map_file, events=("start", "end")):
+            if event == "start":
+                if raw_map is None:
+                    raw_map = element
+                depth += 1
+                continue
+
+            depth -= 1
+            if depth != 1:
+                # The element is the map itself, or part of a child of the map that
+                # is parsed when that child ends
+                continue
+
+            if element.tag == "tileset":
+                tilesets[int(element.attrib["firstgid"])] = _parse_tileset(
+                    element, parent_dir
+                )
+            elif element.tag in LAYER_TAGS:
+                layers.append(parse_layer(element, parent_dir))
+            elif element.tag == "properties":
+                properties_element = element
+                continue
+
+            raw_map.remove(element)
+
+    assert raw_map is not None
+    # ---- Changed End ----
 
     map_ = TiledMap(
         map_file=file,
@@ -84,9 +129,9 @@ def parse(file: Path) -> TiledMap:
         version=raw_map.attrib["version"],
     )
 
-    layers = [layer for layer in map_.layers if hasattr(layer, "tiled_objects")]
-
-    for my_layer in layers:
+    # ---- Changed ----
+    for my_layer in _iter_object_layers(map_.layers):
+    # ---- Changed End ----
         # Mypy extremely hates what is going on in this whole block
         # For some reason an ignore on this first for loop is causing it
         # to just not care about any of the problems in here.
@@ -135,8 +180,9 @@ def parse(file: Path) -> TiledMap:
     if raw_map.attrib.get("hexsidelength") is not None:
         map_.hex_side_length = int(raw_map.attrib["hexsidelength"])
 
-    properties_element = raw_map.find("./properties")
+    # ---- Changed ----
     if properties_element:
+    # ---- Changed End ----
         map_.properties = parse_properties(properties_element)
 
     if raw_map.attrib.get("staggeraxis") is not None:
@@ -159,6 +205,8 @@ def parse(file: Path) -> TiledMap:
 
     map_.parallax_origin = OrderedPair(_parallax_origin_x, _parallax_origin_y)
 
+    map_.objects = index_objects(map_.layers)
+
     # ---- Changed ----
     ObjectID.tilemap = map_
     # ---- Changed End ----
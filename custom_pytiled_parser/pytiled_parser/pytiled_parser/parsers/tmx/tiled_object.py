@@ -1,3 +1,4 @@
+import copy
 import xml.etree.ElementTree as etree
 from pathlib import Path
 from typing import Callable, Optional
@@ -245,6 +246,45 @@ def _get_parser(raw_object: etree.Element) -> Callable[[etree.Element], TiledObj
     return _parse_rectangle
 
 
+# ---- Changed ----
+def _apply_template(
+    template_object: etree.Element, raw_object: etree.Element
+) -> etree.Element:
+    """Create the object element for an object which uses a template.
+
+    Attributes and properties of the object override those of the template.
+
+    Args:
+        template_object: The object element from the template. It is not modified.
+        raw_object: The object element from the map.
+
+    Returns:
+        etree.Element: A new element combining the template and the object.
+    """
+    new_object = copy.copy(template_object)
+    new_object.attrib = {**template_object.attrib, **raw_object.attrib}
+
+    raw_properties = raw_object.find("./properties")
+    if raw_properties is not None:
+        template_properties = template_object.find("./properties")
+        properties = etree.Element("properties")
+        if template_properties is not None:
+            new_object.remove(template_properties)
+            overridden = {child.attrib.get("name") for child in raw_properties}
+            properties.extend(
+                child
+                for child in template_properties
+                if child.attrib.get("name") not in overridden
+            )
+        properties.extend(raw_properties)
+        new_object.append(properties)
+
+    return new_object
+
+
+# ---- Changed End ----
+
+
 def parse(raw_object: etree.Element, parent_dir: Optional[Path] = None) -> TiledObject:
     """Parse the raw object into a pytiled_parser version
 
@@ -273,12 +313,10 @@ def parse(raw_object: etree.Element, parent_dir: Optional[Path] = None) -> Tiled
             new_object = template.find("./object")
             if new_object is not None:
                 # ---- Changed ----
-                # We put new_object FIRST because we need raw_object to override new_object. In other words, we are
-                # overriding the template.
-                raw_object.attrib = {**new_object.attrib, **raw_object.attrib}
+                # The template is shared by every object using it, so it is copied
+                # rather than modified.
+                raw_object = _apply_template(new_object, raw_object)
                 # ---- Changed End ----
-
-                raw_object = new_object
         elif isinstance(template, dict):
             # load the JSON object into the XML object
             raise NotImplementedError(
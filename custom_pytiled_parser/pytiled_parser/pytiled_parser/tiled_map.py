@@ -10,6 +10,7 @@ import attr
 from pytiled_parser.common_types import Color, OrderedPair, Size
 from pytiled_parser.layer import Layer
 from pytiled_parser.properties import Properties
+from pytiled_parser.tiled_object import TiledObject
 from pytiled_parser.tileset import Tileset
 
 TilesetDict = Dict[int, Tileset]
@@ -53,6 +54,8 @@ class TiledMap:
             or "odd" indexes along the staggered axis are shifted.
         class_: The Tiled class of this Map.
         parallax_origin: The point on the map to center the parallax scrolling of layers on.
+        objects: Dict of every TiledObject in the map's object layers, including those
+            nested in layer groups, where Key is the object ID. Built by the parsers.
     """
 
     infinite: bool
@@ -76,3 +79,5 @@ class TiledMap:
     hex_side_length: Optional[int] = None
     stagger_axis: Optional[str] = None
     stagger_index: Optional[str] = None
+
+    objects: Dict[int, TiledObject] = attr.ib(factory=dict, eq=False, repr=False)
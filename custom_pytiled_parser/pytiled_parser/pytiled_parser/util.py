@@ -1,10 +1,13 @@
 """Utility Functions for PyTiled"""
 import json
+import os
 import xml.etree.ElementTree as etree
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from pytiled_parser.common_types import Color
+from pytiled_parser.layer import Layer, LayerGroup, ObjectLayer
+from pytiled_parser.tiled_object import TiledObject
 
 
 def parse_color(color: str) -> Color:
@@ -45,41 +48,129 @@ def check_format(file_path: Path) -> str:
             return "json"
 
 
+def _read_document(file_path: Path) -> Any:
+    """Read a TMX/TSX/TX file into its root XML Element, or a JSON file into a dict."""
+    file_format = check_format(file_path)
+
+    with open(file_path) as file:
+        if file_format == "tmx":
+            return etree.parse(file).getroot()
+        else:
+            return json.load(file)
+
+
+class ParseCache:
+    """Cache of the files read while parsing maps.
+
+    Object templates, external tilesets and world files are read through this cache,
+    so a file used many times, such as the template of every enemy in a map, is only
+    opened and parsed once. Entries are keyed by the resolved path of the file and
+    are reloaded if the file's modification time changes.
+
+    The cached documents are shared, so the parsers must not modify them.
+
+    Attributes:
+        hits: Number of reads served from the cache.
+        misses: Number of reads that had to load the file.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[Tuple[Path, Callable[[Path], Any]], Tuple[int, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def load(
+        self, file_path: Path, loader: Callable[[Path], Any] = _read_document
+    ) -> Any:
+        """Load a file through the cache.
+
+        Args:
+            file_path: Path to the file.
+            loader: Function which reads the file. Each loader has its own entries.
+
+        Returns:
+            Any: What the loader returned for the file, possibly from an earlier call.
+        """
+        key = (Path(file_path).resolve(), loader)
+        mtime = os.stat(key[0]).st_mtime_ns
+
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == mtime:
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        value = loader(file_path)
+        self._entries[key] = (mtime, value)
+        return value
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """The hit and miss counts, and the number of cached files."""
+        return {"hits": self.hits, "misses": self.misses, "files": len(self._entries)}
+
+    def clear(self) -> None:
+        """Remove every cached file and reset the counts."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+parse_cache = ParseCache()
+
+
+def _read_object_template(file_path: Path) -> Tuple[Any, Optional[Path]]:
+    template = _read_document(file_path)
+
+    tileset_path = None
+    if isinstance(template, etree.Element):
+        tileset_element = template.find("./tileset")
+        if tileset_element is not None:
+            tileset_path = Path(file_path.parent / tileset_element.attrib["source"])
+    elif "tileset" in template:
+        tileset_path = Path(file_path.parent / template["tileset"]["source"])
+
+    return (template, tileset_path)
+
+
 def load_object_template(file_path: Path) -> Any:
-    template_format = check_format(file_path)
+    # The tileset is looked up on every call rather than cached with the template, so
+    # changes to it are picked up even when the template itself hasn't changed.
+    template, tileset_path = parse_cache.load(file_path, _read_object_template)
 
     new_tileset = None
     new_tileset_path = None
 
-    if template_format == "tmx":
-        with open(file_path) as template_file:
-            template = etree.parse(template_file).getroot()
-
-            tileset_element = template.find("./tileset")
-            if tileset_element is not None:
-                tileset_path = Path(file_path.parent / tileset_element.attrib["source"])
-                new_tileset = load_object_tileset(tileset_path)
-                new_tileset_path = tileset_path.parent
-    else:
-        with open(file_path) as template_file:
-            template = json.load(template_file)
-            if "tileset" in template:
-                tileset_path = Path(file_path.parent / template["tileset"]["source"])  # type: ignore
-                new_tileset = load_object_tileset(tileset_path)
-                new_tileset_path = tileset_path.parent
+    if tileset_path is not None:
+        new_tileset = load_object_tileset(tileset_path)
+        new_tileset_path = tileset_path.parent
 
     return (template, new_tileset, new_tileset_path)
 
 
 def load_object_tileset(file_path: Path) -> Any:
-    tileset_format = check_format(file_path)
+    return parse_cache.load(file_path)
 
-    new_tileset = None
 
-    with open(file_path) as tileset_file:
-        if tileset_format == "tmx":
-            new_tileset = etree.parse(tileset_file).getroot()
-        else:
-            new_tileset = json.load(tileset_file)
+def index_objects(layers: List[Layer]) -> Dict[int, TiledObject]:
+    """Map the ID of every object in the layers to the object.
+
+    Objects in layer groups are included, however deeply they are nested.
 
-    return new_tileset
+    Args:
+        layers: The layers to index.
+
+    Returns:
+        Dict[int, TiledObject]: The objects, keyed by their ID.
+    """
+    objects: Dict[int, TiledObject] = {}
+    to_index = list(layers)
+    while to_index:
+        layer = to_index.pop()
+        if isinstance(layer, ObjectLayer):
+            for tiled_object in layer.tiled_objects:
+                objects[tiled_object.id] = tiled_object
+        elif isinstance(layer, LayerGroup) and layer.layers:
+            to_index.extend(layer.layers)
+
+    return objects
@@ -9,7 +9,6 @@ does not automatically load each map within the world, this is so that the game
 or engine implementation can decide how to handle map loading.
 """
 
-import json
 import re
 from os import listdir
 from os.path import isfile, join
@@ -20,6 +19,7 @@ import attr
 from typing_extensions import TypedDict
 
 from pytiled_parser.common_types import OrderedPair, Size
+from pytiled_parser.util import parse_cache
 
 
 @attr.s(auto_attribs=True)
@@ -110,8 +110,7 @@ def parse_world(file: Path) -> World:
         World: A properly parsed [World][pytiled_parser.world.World]
     """
 
-    with open(file) as world_file:
-        raw_world = json.load(world_file)
+    raw_world = parse_cache.load(file)
 
     parent_dir = file.parent
 
@@ -2,12 +2,14 @@
 import importlib.util
 import json
 import os
+import pickle
 import xml.etree.ElementTree as etree
 from pathlib import Path
 
 import pytest
 
 from pytiled_parser.common_types import OrderedPair, Size
+from pytiled_parser.layer import LazyTileGrid, TileGrid
 from pytiled_parser.parsers.json.layer import parse as parse_json
 from pytiled_parser.parsers.tmx.layer import parse as parse_tmx
 
@@ -136,3 +138,110 @@ def test_unknown_layer_type():
         raw_layers = json.load(raw_layers_file)["layers"]
         with pytest.raises(RuntimeError):
             layers = [parse_json(raw_layer) for raw_layer in raw_layers]
+
+
+@pytest.mark.parametrize(
+    "layer_test",
+    [LAYER_TESTS / "b64", LAYER_TESTS / "b64_gzip", LAYER_TESTS / "b64_zlib"],
+)
+def test_decoded_grid_matches_csv(layer_test):
+    with open(layer_test / "map.tmx") as raw_layers_file:
+        raw_layer = etree.parse(raw_layers_file).getroot().find("./layer")
+    with open(LAYER_TESTS / "all_layer_types" / "map.tmx") as raw_layers_file:
+        csv_layer = etree.parse(raw_layers_file).getroot().find("./layer")
+
+    grid = parse_tmx(raw_layer).data
+    csv_grid = parse_tmx(csv_layer).data
+
+    assert isinstance(grid, TileGrid)
+    assert grid == csv_grid
+    assert grid.view.shape == (6, 8)
+    assert grid.view[1, 2] == grid[1][2] == 11
+    assert grid.view.tolist() == grid.tolist()
+
+
+def test_tile_grid_compatibility_view():
+    grid = TileGrid.from_list([1, 2, 3, 4, 5, 6], 3)
+
+    assert grid == [[1, 2, 3], [4, 5, 6]]
+    assert len(grid) == 2
+    assert list(grid) == [[1, 2, 3], [4, 5, 6]]
+    assert grid[-1] == [4, 5, 6]
+    assert grid.tolist() is grid.tolist()
+    assert list(grid.values) == [1, 2, 3, 4, 5, 6]
+    assert TileGrid.from_list([], 3) == [[]]
+
+
+def test_tile_grid_pickle():
+    grid = TileGrid.from_list([1, 2, 3, 4, 5, 6], 3)
+
+    assert pickle.loads(pickle.dumps(grid, protocol=2)) == grid
+
+    buffers = []
+    dumped = pickle.dumps(grid, protocol=5, buffer_callback=buffers.append)
+    loaded = pickle.loads(dumped, buffers=[buffer.raw() for buffer in buffers])
+
+    assert len(buffers) == 1
+    assert loaded == grid
+    assert loaded.view.shape == (2, 3)
+
+
+def test_lazy_tile_grid():
+    decodes = []
+
+    def decode():
+        decodes.append(1)
+        return TileGrid.from_list([1, 2, 3, 4, 5, 6], 3)
+
+    grid = LazyTileGrid(decode, 3, 2)
+    assert not grid.decoded
+    assert (grid.width, grid.height) == (3, 2)
+
+    assert grid == [[1, 2, 3], [4, 5, 6]]
+    assert grid.view.shape == (2, 3)
+    assert grid.decoded
+    assert len(decodes) == 1
+
+    grid.release()
+    assert not grid.decoded
+    assert grid == [[1, 2, 3], [4, 5, 6]]
+    assert len(decodes) == 2
+
+
+@pytest.mark.parametrize("parser_type", ["json", "tmx"])
+def test_chunks_decoded_lazily(parser_type):
+    map_path = LAYER_TESTS / "infinite_map_b64" / f"map.{parser_type}"
+    if parser_type == "json":
+        with open(map_path) as raw_layers_file:
+            layer = parse_json(json.load(raw_layers_file)["layers"][0])
+    else:
+        with open(map_path) as raw_layers_file:
+            layer = parse_tmx(etree.parse(raw_layers_file).getroot().find("./layer"))
+
+    chunk = layer.chunks[0]
+    assert isinstance(chunk.data, LazyTileGrid)
+    assert not chunk.data.decoded
+    assert len(chunk.data) == chunk.size.height
+    assert chunk.data.decoded
+
+
+@pytest.mark.parametrize("parser_type", ["json", "tmx"])
+@pytest.mark.parametrize("protocol", [4, 5])
+def test_pickled_chunks_stay_lazy(parser_type, protocol):
+    map_path = LAYER_TESTS / "infinite_map_b64" / f"map.{parser_type}"
+    if parser_type == "json":
+        with open(map_path) as raw_layers_file:
+            layer = parse_json(json.load(raw_layers_file)["layers"][0])
+    else:
+        with open(map_path) as raw_layers_file:
+            layer = parse_tmx(etree.parse(raw_layers_file).getroot().find("./layer"))
+
+    chunk = layer.chunks[0]
+    # Decoding the original first must not make the pickle carry the decoded tiles
+    assert len(chunk.data) == chunk.size.height
+    loaded = pickle.loads(pickle.dumps(chunk, protocol=protocol))
+
+    assert isinstance(loaded.data, LazyTileGrid)
+    assert loaded.data.decoded is False
+    assert loaded.data == chunk.data
+    assert loaded.data.decoded
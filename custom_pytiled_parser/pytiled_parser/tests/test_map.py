@@ -91,3 +91,31 @@ def test_json_invalid_tileset():
 
     with pytest.raises(UnknownFormat):
         parse_map(raw_map_path)
+
+
+@pytest.mark.parametrize("parser_type", ["json", "tmx"])
+def test_object_index(parser_type):
+    # The only object in this map is inside a layer group
+    map_path = TEST_DATA / "layer_tests" / "all_layer_types" / f"map.{parser_type}"
+
+    casted_map = parse_map(map_path)
+
+    group = casted_map.layers[1]
+    assert casted_map.objects == {1: group.layers[0].tiled_objects[0]}
+    assert casted_map.objects[1] is group.layers[0].tiled_objects[0]
+
+
+def test_tmx_group_layers_parsed_once():
+    # Layers inside a group only belong to the group, like in the JSON format
+    map_path = TEST_DATA / "layer_tests" / "all_layer_types"
+
+    tmx_map = parse_map(map_path / "map.tmx")
+    json_map = parse_map(map_path / "map.json")
+
+    assert [layer.name for layer in tmx_map.layers] == [
+        layer.name for layer in json_map.layers
+    ]
+    group = tmx_map.layers[1]
+    assert [layer.name for layer in group.layers] == [
+        layer.name for layer in json_map.layers[1].layers
+    ]
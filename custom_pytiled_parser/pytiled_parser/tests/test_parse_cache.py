@@ -0,0 +1,40 @@
+"""Tests for the parse cache"""
+import os
+import xml.etree.ElementTree as etree
+from pathlib import Path
+
+from pytiled_parser import parse_map
+from pytiled_parser.util import ParseCache, parse_cache
+
+TESTS_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATE_MAP = TESTS_DIR / "test_data" / "map_tests" / "template" / "map.tmx"
+
+
+def test_parse_cache_reloads_changed_files(tmp_path):
+    cache = ParseCache()
+    tileset_path = tmp_path / "tileset.tsx"
+    tileset_path.write_text('<tileset name="first"/>')
+
+    first = cache.load(tileset_path)
+    assert isinstance(first, etree.Element)
+    assert cache.load(tmp_path / "." / "tileset.tsx") is first
+    assert cache.stats == {"hits": 1, "misses": 1, "files": 1}
+
+    tileset_path.write_text('<tileset name="second"/>')
+    stat = os.stat(tileset_path)
+    os.utime(tileset_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert cache.load(tileset_path).attrib["name"] == "second"
+    assert cache.stats == {"hits": 1, "misses": 2, "files": 1}
+
+
+def test_templates_and_tilesets_are_cached():
+    parse_cache.clear()
+
+    first_map = parse_map(TEMPLATE_MAP)
+    misses = parse_cache.misses
+    second_map = parse_map(TEMPLATE_MAP)
+
+    assert parse_cache.misses == misses
+    assert parse_cache.hits >= misses
+    assert first_map == second_map
@@ -0,0 +1,247 @@
+"""
+A packed texture atlas of the game's images, built offline.
+
+Character frames and tiles are small separate PNGs. pack() puts all of them into one atlas
+image, with an index that has the rectangle of every frame and its hit boxes, facing right
+and flipped to face left. At startup the atlas image is decoded once, and textures are cut
+from it instead of opening and decoding dozens of files.
+
+Frames are named by their path relative to the project root, like
+"src/assets/images/player/idle1.png", so any path to an image can be looked up.
+
+Build the atlas from the project root after changing any image:
+
+    python src/asset_atlas.py [--images src/assets/images] [--output src/assets/atlas]
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import PIL.Image
+import PIL.ImageOps
+from arcade import Texture, calculate_hit_box_points_detailed, calculate_hit_box_points_simple
+
+from constants import ASSET_ATLAS_DIR, ASSET_IMAGES_DIR
+
+ATLAS_VERSION = 1
+ATLAS_IMAGE = "atlas.png"
+ATLAS_INDEX = "atlas.json"
+
+Rect = Tuple[int, int, int, int]
+HitBox = Tuple[Tuple[float, float], ...]
+
+
+class AtlasError(Exception): pass
+
+
+def get_frame_name(file_name: Union[str, Path]) -> str:
+    """The name of the frame of an image file in the atlas."""
+    return Path(os.path.relpath(os.path.abspath(file_name))).as_posix()
+
+
+def _calculate_hit_box(image: PIL.Image.Image, hit_box_algorithm: str, hit_box_detail: float) -> HitBox:
+    if hit_box_algorithm == "Simple":
+        points = calculate_hit_box_points_simple(image)
+    elif hit_box_algorithm == "Detailed":
+        points = calculate_hit_box_points_detailed(image, hit_box_detail)
+    else:
+        raise AtlasError(f"Can't pack hit boxes made with the {hit_box_algorithm} algorithm.")
+    return tuple((float(x), float(y)) for x, y in points)
+
+
+def _pack_shelves(sizes: List[Tuple[int, int]], width: int) -> Tuple[List[Tuple[int, int]], int]:
+    """
+    Place rectangles on shelves, left to right and top to bottom, tallest first.
+    Returns the position of every rectangle, and the height used.
+    """
+    positions: List[Tuple[int, int]] = [(0, 0)] * len(sizes)
+    x = y = shelf_height = 0
+    for index in sorted(range(len(sizes)), key=lambda index: -sizes[index][1]):
+        frame_width, frame_height = sizes[index]
+        if x + frame_width > width:
+            x = 0
+            y += shelf_height
+            shelf_height = 0
+        positions[index] = (x, y)
+        x += frame_width
+        shelf_height = max(shelf_height, frame_height)
+    return positions, y + shelf_height
+
+
+def pack(
+    images_dir: Union[str, Path] = ASSET_IMAGES_DIR,
+    output_dir: Union[str, Path] = ASSET_ATLAS_DIR,
+    hit_box_algorithm: str = "Simple",
+    hit_box_detail: float = 4.5,
+) -> Dict:
+    """
+    Pack every PNG under a directory into an atlas image, and write it with its index to the
+    output directory. Returns the index.
+    """
+    files = sorted(Path(images_dir).rglob("*.png"))
+    if not files:
+        raise AtlasError(f"There are no images to pack in {images_dir}.")
+    images = [PIL.Image.open(file).convert("RGBA") for file in files]
+
+    sizes = [image.size for image in images]
+    area = sum(width * height for width, height in sizes)
+    width = max(max(width for width, _ in sizes), 2 ** math.ceil(math.log2(math.sqrt(area))))
+    positions, height = _pack_shelves(sizes, width)
+
+    atlas = PIL.Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    frames = {}
+    for file, image, (x, y) in zip(files, images, positions):
+        atlas.paste(image, (x, y))
+        frames[get_frame_name(file)] = {
+            "rect": [x, y, image.width, image.height],
+            "hit_box": _calculate_hit_box(image, hit_box_algorithm, hit_box_detail),
+            "flipped_hit_box": _calculate_hit_box(PIL.ImageOps.mirror(image), hit_box_algorithm, hit_box_detail),
+        }
+
+    index = {
+        "version": ATLAS_VERSION,
+        "image": ATLAS_IMAGE,
+        "size": [width, height],
+        "hit_box_algorithm": hit_box_algorithm,
+        "hit_box_detail": hit_box_detail,
+        "frames": frames,
+    }
+    os.makedirs(output_dir, exist_ok=True)
+    atlas.save(Path(output_dir, ATLAS_IMAGE), optimize=True)
+    # The index is written last, so an atlas image without an index is never used
+    with open(Path(output_dir, ATLAS_INDEX), "w") as file:
+        json.dump(index, file, separators=(",", ":"))
+    return index
+
+
+class PackedAtlas:
+    """
+    An atlas built by pack(), with its image decoded.
+    :param Union[str, Path] atlas_dir: The directory the atlas was written to.
+    Attributes:
+        :image: The atlas image.
+        :frames: The rectangle, hit box and flipped hit box of every frame, by frame name.
+        :textures_created: How many textures were cut from the atlas.
+    """
+
+    def __init__(self, atlas_dir: Union[str, Path]):
+        with open(Path(atlas_dir, ATLAS_INDEX)) as file:
+            index = json.load(file)
+        if index.get("version") != ATLAS_VERSION:
+            raise AtlasError(f"The atlas in {atlas_dir} is out of date, build it again.")
+
+        self.image = PIL.Image.open(Path(atlas_dir, index["image"]))
+        self.image.load()
+        self.hit_box_algorithm: str = index["hit_box_algorithm"]
+        self.hit_box_detail: float = index["hit_box_detail"]
+        self.frames: Dict[str, Tuple[Rect, HitBox, HitBox]] = {
+            name: (
+                tuple(frame["rect"]),
+                tuple(map(tuple, frame["hit_box"])),
+                tuple(map(tuple, frame["flipped_hit_box"])),
+            )
+            for name, frame in index["frames"].items()
+        }
+        self.textures_created = 0
+
+    def __contains__(self, file_name: Union[str, Path]) -> bool:
+        return get_frame_name(file_name) in self.frames
+
+    def get_texture(
+        self,
+        file_name: Union[str, Path],
+        image_x: int = 0,
+        image_y: int = 0,
+        width: int = 0,
+        height: int = 0,
+        flipped_horizontally: bool = False,
+        flipped_vertically: bool = False,
+        flipped_diagonally: bool = False,
+        hit_box_algorithm: str = "Simple",
+        hit_box_detail: float = 4.5,
+    ) -> Texture:
+        """
+        Cut a texture from the atlas, like arcade.load_texture() would load it from the image
+        file. A width and height of 0 take the whole image. The hit box comes from the index
+        when it was computed for the same image and algorithm.
+        """
+        name = get_frame_name(file_name)
+        (frame_x, frame_y, frame_width, frame_height), hit_box, flipped_hit_box = self.frames[name]
+        width = width or frame_width
+        height = height or frame_height
+        left = frame_x + image_x
+        top = frame_y + image_y
+        image = self.image.crop((left, top, left + width, top + height))
+
+        if flipped_diagonally:
+            image = image.transpose(PIL.Image.TRANSPOSE)
+        if flipped_horizontally:
+            image = image.transpose(PIL.Image.FLIP_LEFT_RIGHT)
+        if flipped_vertically:
+            image = image.transpose(PIL.Image.FLIP_TOP_BOTTOM)
+
+        texture = Texture(
+            f"{name}-{image_x}-{image_y}-{width}-{height}-"
+            f"{flipped_horizontally}-{flipped_vertically}-{flipped_diagonally}-{hit_box_algorithm}",
+            image=image,
+            hit_box_algorithm=hit_box_algorithm,
+            hit_box_detail=hit_box_detail,
+        )
+        whole_frame = (image_x, image_y, width, height) == (0, 0, frame_width, frame_height)
+        same_algorithm = hit_box_algorithm == self.hit_box_algorithm and (
+            hit_box_algorithm != "Detailed" or hit_box_detail == self.hit_box_detail
+        )
+        if whole_frame and same_algorithm and not (flipped_vertically or flipped_diagonally):
+            texture._hit_box_points = flipped_hit_box if flipped_horizontally else hit_box
+        self.textures_created += 1
+        return texture
+
+
+def load_atlas(atlas_dir: Union[str, Path] = ASSET_ATLAS_DIR) -> Optional[PackedAtlas]:
+    """
+    Load a packed atlas. Returns None if it wasn't built, was built by an older version, or
+    if any of its images were changed since, so they are loaded from their own files instead.
+    """
+    index_file = Path(atlas_dir, ATLAS_INDEX)
+    if not index_file.exists():
+        return None
+    try:
+        atlas = PackedAtlas(atlas_dir)
+    except AtlasError as error:
+        print(f"Warning, {error} Not using the atlas.")
+        return None
+    built = index_file.stat().st_mtime
+    for name in atlas.frames:
+        if not os.path.exists(name) or os.path.getmtime(name) > built:
+            print(f"Warning, {name} changed since the atlas in {atlas_dir} was built. Not using the atlas.")
+            return None
+    return atlas
+
+
+# The game's atlas, if it was built
+DEFAULT_ATLAS = load_atlas()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Pack the game's images into a texture atlas.")
+    arg_parser.add_argument("--images", default=ASSET_IMAGES_DIR, help="The directory of the images to pack")
+    arg_parser.add_argument("--output", default=ASSET_ATLAS_DIR, help="The directory to write the atlas to")
+    arg_parser.add_argument("--hit-box-algorithm", choices=("Simple", "Detailed"), default="Simple",
+                            help="The algorithm the hit boxes are computed with")
+    arg_parser.add_argument("--hit-box-detail", type=float, default=4.5, help="The detail of Detailed hit boxes")
+    args = arg_parser.parse_args()
+
+    start = time.perf_counter()
+    index = pack(args.images, args.output, args.hit_box_algorithm, args.hit_box_detail)
+    width, height = index["size"]
+    print(f"Packed {len(index['frames'])} images into a {width}x{height} atlas in {args.output} "
+          f"in {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
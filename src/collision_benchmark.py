@@ -0,0 +1,89 @@
+"""
+Compares the per-frame cost of the player's trigger collisions: the TileSpriteGrid lookup the
+game uses, against calling arcade.check_for_collision_with_list on every trigger layer.
+
+A player sized sprite is moved over every tile of the map, and each position counts as one
+frame. Both paths must find the same sprites.
+
+Run from the project root:
+
+    python src/collision_benchmark.py [map name] [--number 5]
+"""
+
+import argparse
+import timeit
+
+import arcade
+
+from collisions import CollisionDispatcher, TileSpriteGrid
+from constants import *
+import custom_tilemap
+import map_cache
+
+TYPES_TO_LAYER = {
+    "coin": COINS_LAYER,
+    "lava": DANGER_LAYER,
+    "goal": GOAL_LAYER,
+    "blue_jump_pad": JUMP_PADS_LAYER,
+    "green_jump_pad": JUMP_PADS_LAYER,
+}
+TRIGGER_LAYERS = (COINS_LAYER, DANGER_LAYER, GOAL_LAYER, JUMP_PADS_LAYER)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("map_name", nargs="?", default="basic_tilemap_1", help="A map in the tilemaps folder")
+    arg_parser.add_argument("--number", type=int, default=5, help="Sweeps over the map per timing")
+    args = arg_parser.parse_args()
+
+    map_path = f"src/assets/tilemap_project/tilemaps/{args.map_name}.tmx"
+    tile_map = custom_tilemap.load_tilemap(map_path, TILE_SCALING, lazy=True, tiled_map=map_cache.load_map(map_path))
+
+    sprite_lists = {layer: arcade.SpriteList(use_spatial_hash=True, lazy=True) for layer in TRIGGER_LAYERS}
+    for tile in tile_map.sprite_lists[OBJECTS_LAYER]:
+        layer = TYPES_TO_LAYER.get(tile.properties.get("type"))
+        if layer is not None:
+            sprite_lists[layer].append(tile)
+
+    dispatcher = CollisionDispatcher(TileSpriteGrid.from_tilemap(tile_map))
+    for layer, sprite_list in sprite_lists.items():
+        dispatcher.register(layer, sprite_list, lambda hit_list: None)
+
+    player = arcade.SpriteSolidColor(12 * CHARACTER_SCALING, 16 * CHARACTER_SCALING, arcade.color.WHITE)
+    positions = [
+        ((x + 0.5) * GRID_PIXEL_SIZE, (y + 0.5) * GRID_PIXEL_SIZE)
+        for y in range(tile_map.height)
+        for x in range(tile_map.width)
+    ]
+
+    def sweep_sprite_lists():
+        hits = 0
+        for player.center_x, player.center_y in positions:
+            for sprite_list in sprite_lists.values():
+                hits += len(arcade.check_for_collision_with_list(player, sprite_list))
+        return hits
+
+    def sweep_grid():
+        hits = 0
+        candidates = 0
+        for player.center_x, player.center_y in positions:
+            hits += sum(len(hit_list) for hit_list in dispatcher.query(player).values())
+            candidates += dispatcher.stats.candidates
+        return hits, candidates
+
+    expected_hits = sweep_sprite_lists()
+    hits, candidates = sweep_grid()
+    if hits != expected_hits:
+        print(f"Warning, the grid found {hits} hits but the sprite lists found {expected_hits}")
+
+    frames = len(positions)
+    triggers = sum(len(sprite_list) for sprite_list in sprite_lists.values())
+    print(f"{args.map_name}: {triggers} trigger tiles, {frames} frames, {hits} hits")
+    print(f"Tile grid candidates checked per frame: {candidates / frames:.2f}")
+    for name, sweep in (("sprite lists", sweep_sprite_lists), ("tile grid", sweep_grid)):
+        seconds = min(timeit.repeat(sweep, number=args.number, repeat=3)) / args.number
+        print(f"{name:<14}{seconds / frames * 1e6:>10.2f} us per frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Collision lookups against static, tile aligned sprites, and the player collision dispatch
+for trigger layers, like coins, dangers, goals and jump pads.
+
+Tiles sit on the map's tile grid and never move, so instead of testing their polygons,
+they are stored in a TileSpriteGrid: a flat typed array with one kind per tile, plus the
+bounding box of the sprite in each occupied tile. A bounding box picks the tiles to look
+at, so the cost only depends on how many tiles it covers, not on how many the level has.
+"""
+
+from array import array
+from math import floor
+from typing import Callable, Dict, List, Optional
+
+import arcade
+
+import custom_tilemap
+
+# Called with the sprites of one layer that the player touched. Returning True stops the
+# dispatch for this frame, for example when the handler reloaded the level.
+CollisionHandler = Callable[[List[arcade.Sprite]], Optional[bool]]
+
+# The kind of a tile with no sprite on it
+EMPTY_TILE = 0
+
+
+class CollisionStats:
+    """Counts the collision work done in the last frame."""
+
+    def __init__(self):
+        self.cells = 0
+        self.candidates = 0
+        self.hits = 0
+
+    def reset(self):
+        self.cells = 0
+        self.candidates = 0
+        self.hits = 0
+
+    def __repr__(self):
+        return f"CollisionStats(cells={self.cells}, candidates={self.candidates}, hits={self.hits})"
+
+
+class TileSpriteGrid:
+    """
+    A 2-D grid of sprite kinds, one per tile, in rows from the bottom of the map up.
+    Kind 0 is an empty tile. Each occupied tile also keeps its sprite and the sprite's
+    bounding box, so a box only hits the tile when it overlaps the sprite.
+    :param int width: The width of the grid in tiles.
+    :param int height: The height of the grid in tiles.
+    :param float cell_width: The width of a tile in pixels, after scaling.
+    :param float cell_height: The height of a tile in pixels, after scaling.
+    """
+
+    def __init__(self, width: int, height: int, cell_width: float, cell_height: float):
+        self.width = width
+        self.height = height
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        size = width * height
+        self.kinds = array("B", bytes(size))
+        self.lefts = array("d", bytes(8 * size))
+        self.bottoms = array("d", bytes(8 * size))
+        self.rights = array("d", bytes(8 * size))
+        self.tops = array("d", bytes(8 * size))
+        self.sprites: Dict[int, arcade.Sprite] = {}
+
+    @classmethod
+    def from_tilemap(cls, tile_map: "custom_tilemap.CustomTileMap") -> "TileSpriteGrid":
+        """Create an empty grid covering a tilemap."""
+        return cls(
+            tile_map.width,
+            tile_map.height,
+            tile_map.tile_width * tile_map.scaling,
+            tile_map.tile_height * tile_map.scaling,
+        )
+
+    def _get_index(self, sprite: arcade.Sprite) -> int:
+        cell_x = floor(sprite.center_x / self.cell_width)
+        cell_y = floor(sprite.center_y / self.cell_height)
+        if not (0 <= cell_x < self.width and 0 <= cell_y < self.height):
+            raise ValueError(f"Sprite at ({sprite.center_x}, {sprite.center_y}) is outside the map.")
+        return cell_y * self.width + cell_x
+
+    def get_kind(self, sprite: arcade.Sprite) -> int:
+        """The kind of the tile a sprite's center is in. Raises ValueError if it is outside the map."""
+        return self.kinds[self._get_index(sprite)]
+
+    def add(self, sprite: arcade.Sprite, kind: int):
+        """Put a sprite into the tile its center is in."""
+        index = self._get_index(sprite)
+        if self.kinds[index] != EMPTY_TILE:
+            raise ValueError(f"Two sprites share the tile at ({sprite.center_x}, {sprite.center_y}).")
+        self.kinds[index] = kind
+        self.lefts[index] = sprite.left
+        self.bottoms[index] = sprite.bottom
+        self.rights[index] = sprite.right
+        self.tops[index] = sprite.top
+        self.sprites[index] = sprite
+
+    def remove(self, sprite: arcade.Sprite):
+        """Clear the tile of a sprite, for example a collected coin."""
+        index = self._get_index(sprite)
+        if self.sprites.get(index) is sprite:
+            self.kinds[index] = EMPTY_TILE
+            del self.sprites[index]
+
+    def query(self, left: float, bottom: float, right: float, top: float, stats: CollisionStats) -> List[int]:
+        """Return the indexes of the occupied tiles whose sprite overlaps the given box."""
+        first_x = max(floor(left / self.cell_width), 0)
+        last_x = min(floor(right / self.cell_width), self.width - 1)
+        first_y = max(floor(bottom / self.cell_height), 0)
+        last_y = min(floor(top / self.cell_height), self.height - 1)
+
+        kinds = self.kinds
+        hits = []
+        for cell_y in range(first_y, last_y + 1):
+            row = cell_y * self.width
+            for index in range(row + first_x, row + last_x + 1):
+                stats.cells += 1
+                if kinds[index] == EMPTY_TILE:
+                    continue
+                stats.candidates += 1
+                if (
+                    left < self.rights[index]
+                    and right > self.lefts[index]
+                    and bottom < self.tops[index]
+                    and top > self.bottoms[index]
+                ):
+                    hits.append(index)
+        return hits
+
+
+class CollisionDispatcher:
+    """
+    Finds the trigger sprites the player touches and hands them to their layer's handler.
+    Each registered layer is its own trigger kind in the grid.
+    :param TileSpriteGrid grid: The empty grid to put the registered sprites in.
+    """
+
+    def __init__(self, grid: TileSpriteGrid):
+        self.grid = grid
+        self.stats = CollisionStats()
+        self._layer_names: List[str] = []
+        self._handlers: List[CollisionHandler] = []
+
+    def register(self, layer_name: str, sprite_list: arcade.SpriteList, handler: CollisionHandler):
+        """
+        Register a layer of static, tile aligned sprites and the handler to call when the
+        player touches them. Layers are dispatched in the order they are registered.
+        :param str layer_name: The name of the layer.
+        :param arcade.SpriteList sprite_list: The sprites of the layer.
+        :param CollisionHandler handler: Called with the sprites of the layer that the player touched.
+        """
+        self._layer_names.append(layer_name)
+        self._handlers.append(handler)
+        kind = len(self._layer_names)
+        for sprite in sprite_list:
+            self.grid.add(sprite, kind)
+
+    def remove(self, sprite: arcade.Sprite):
+        """Stop a sprite from triggering its handler, for example once it's removed from the scene."""
+        self.grid.remove(sprite)
+
+    def query(self, player: arcade.Sprite) -> Dict[str, List[arcade.Sprite]]:
+        """Find the registered sprites the player touches, grouped by layer name."""
+        self.stats.reset()
+        hits: Dict[str, List[arcade.Sprite]] = {}
+        for index in self.grid.query(player.left, player.bottom, player.right, player.top, self.stats):
+            layer_name = self._layer_names[self.grid.kinds[index] - 1]
+            hits.setdefault(layer_name, []).append(self.grid.sprites[index])
+        return hits
+
+    def dispatch(self, player: arcade.Sprite):
+        """Call the handlers of the layers the player touches."""
+        hits = self.query(player)
+        for layer_name, handler in zip(self._layer_names, self._handlers):
+            hit_list = hits.get(layer_name)
+            if hit_list:
+                self.stats.hits += len(hit_list)
+                if handler(hit_list):
+                    break
@@ -4,6 +4,11 @@ SCREEN_WIDTH = 1000
 SCREEN_HEIGHT = 650
 SCREEN_TITLE = "Platformer"
 TARGET_FPS = 60
+# The game logic runs at a fixed rate, see timestep.py. Speeds are in pixels per tick, so changing it changes
+# how fast the game plays.
+TICK_RATE = 60
+MAX_TICKS_PER_FRAME = 5  # How many ticks a slow frame can catch up on
+PROFILER_FRAMES = 600  # How many recent frames the profiler keeps timings for, see profiler.py
 CAMERA_SPEED = 0.15  # The speed at which the camera moves to the player
 
 # Constants used to scale our sprites from their original size
@@ -27,6 +32,8 @@ RIGHT_FACING = 0
 LEFT_FACING = 1
 
 TILE_PIXEL_SIZE = 16
+# The static tile layers are drawn in square chunks of this many tiles, and only the chunks on screen are drawn
+CHUNK_SIZE = 16
 GRID_PIXEL_SIZE = TILE_PIXEL_SIZE * TILE_SCALING
 
 # Player starting position
@@ -46,4 +53,32 @@ ENEMIES_LAYER = "Enemies"
 JUMP_PADS_LAYER = "Jump Pads"
 PLAYER_LAYER = "Player"
 OBJECTS_LAYER = "Objects"
-ALL_LAYERS = (PLATFORMS_LAYER, MOVING_PLATFORMS_LAYER, OBJECTS_LAYER, ENEMIES_LAYER)
\ No newline at end of file
+ALL_LAYERS = (PLATFORMS_LAYER, MOVING_PLATFORMS_LAYER, OBJECTS_LAYER, ENEMIES_LAYER)
+
+# How close the player has to come to a map of a world for it to be loaded, and how far they have to go for it to be
+# unloaded again, in pixels. See world_streaming.py
+WORLD_LOAD_RADIUS = 600
+WORLD_EVICT_RADIUS = 900
+
+# The next level starts loading in the background once the player is this close to the goal, in pixels. Once it is
+# loaded, this many of its sprite lists are uploaded to the GPU every frame. See level_loader.py
+LEVEL_PRELOAD_DISTANCE = 12 * GRID_PIXEL_SIZE
+LEVEL_UPLOADS_PER_FRAME = 2
+
+# Directory that parsed maps are cached in, see map_cache.py
+MAP_CACHE_DIR = "src/.map_cache"
+
+# Directory of the packed texture atlas of the images in ASSET_IMAGES_DIR, built by asset_atlas.py. Without it, every
+# image is loaded from its own file
+ASSET_IMAGES_DIR = "src/assets/images"
+ASSET_ATLAS_DIR = "src/assets/atlas"
+
+# File that hit boxes computed from the images are cached in, see hit_box_cache.py
+HIT_BOX_CACHE_FILE = "src/.hit_box_cache.json"
+
+# Directory that images of image layers with a transparent color are cached in once the color is keyed out, see
+# transparent_color.py
+KEYED_IMAGE_CACHE_DIR = "src/.keyed_image_cache"
+
+# How many sounds can play at once. Every sound is played by one of this many reusable voices, see sounds.py
+SOUND_VOICES = 8
@@ -9,9 +9,13 @@ For more info on pytiled-parser see: https://github.com/Beefy-Swain/pytiled_pars
 import copy
 import math
 import os
+import threading
+import weakref
+from bisect import bisect_right
 from collections import OrderedDict
+from itertools import accumulate
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING, Union, cast
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, TYPE_CHECKING, Union
 
 import pytiled_parser
 import pytiled_parser.tiled_object
@@ -21,6 +25,7 @@ from arcade import (
     AnimationKeyframe,
     Sprite,
     SpriteList,
+    Texture,
     get_window,
     load_texture,
 )
@@ -33,6 +38,10 @@ from arcade.geometry_generic import rotate_point
 from arcade.resources import resolve_resource_path
 from pyglet.math import Vec2
 
+import asset_atlas
+import hit_box_cache
+import transparent_color
+
 _FLIPPED_HORIZONTALLY_FLAG = 0x80000000
 _FLIPPED_VERTICALLY_FLAG = 0x40000000
 _FLIPPED_DIAGONALLY_FLAG = 0x20000000
@@ -89,6 +98,341 @@ def _get_image_source(
     return None
 
 
+class TileTextureCache:
+    """
+    Cache of prepared tile textures. Every tile sprite cut from the same region of the
+    same image, with the same flip flags and hit box settings, shares one Texture, and
+    with it one hit box.
+    A cache is created for every CustomTileMap by default. Pass SHARED_TEXTURE_CACHE
+    (or any other instance) to share the textures between maps, for example when the
+    same level is reloaded. A cache can be used from several threads.
+    :param Optional[asset_atlas.PackedAtlas] atlas: The atlas to cut textures from, for
+           images that are in it. Other images are loaded from their files.
+    :param Optional[hit_box_cache.HitBoxCache] hit_boxes: The cache to take the hit boxes
+           of new textures from, instead of computing them from the pixels.
+    Attributes:
+        :hits: The number of lookups that reused a cached texture.
+        :misses: The number of lookups that had to load a new texture.
+        :atlas_misses: The number of those misses that were cut from the atlas.
+    """
+
+    def __init__(
+        self,
+        atlas: Optional[asset_atlas.PackedAtlas] = None,
+        hit_boxes: Optional[hit_box_cache.HitBoxCache] = None,
+    ) -> None:
+        self.atlas = atlas
+        self.hit_boxes = hit_boxes
+        self._textures: Dict[Tuple[Any, ...], Texture] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.atlas_misses = 0
+
+    def get_texture(
+        self,
+        image_file: Union[str, Path],
+        image_x: float,
+        image_y: float,
+        width: float,
+        height: float,
+        flipped_horizontally: bool = False,
+        flipped_vertically: bool = False,
+        flipped_diagonally: bool = False,
+        hit_box_algorithm: str = "Simple",
+        hit_box_detail: float = 4.5,
+    ) -> Texture:
+        """Get the texture for a sub-rectangle of an image, loading it on a miss."""
+        key = (
+            str(image_file),
+            image_x,
+            image_y,
+            width,
+            height,
+            flipped_horizontally,
+            flipped_vertically,
+            flipped_diagonally,
+            hit_box_algorithm,
+            hit_box_detail,
+        )
+        # The level preloader loads textures on its worker thread while the main thread may too
+        with self._lock:
+            texture = self._textures.get(key)
+            if texture is not None:
+                self.hits += 1
+                return texture
+
+            self.misses += 1
+            if self.atlas is not None and image_file in self.atlas:
+                self.atlas_misses += 1
+                texture = self.atlas.get_texture(
+                    image_file,
+                    int(image_x),
+                    int(image_y),
+                    int(width),
+                    int(height),
+                    flipped_horizontally=flipped_horizontally,
+                    flipped_vertically=flipped_vertically,
+                    flipped_diagonally=flipped_diagonally,
+                    hit_box_algorithm=hit_box_algorithm,
+                    hit_box_detail=hit_box_detail,
+                )
+            else:
+                texture = load_texture(
+                    image_file,
+                    image_x,
+                    image_y,
+                    width,
+                    height,
+                    flipped_horizontally=flipped_horizontally,
+                    flipped_vertically=flipped_vertically,
+                    flipped_diagonally=flipped_diagonally,
+                    hit_box_algorithm=hit_box_algorithm,
+                    hit_box_detail=hit_box_detail,
+                )
+            # Work out the hit box now, so every sprite using the texture shares it
+            if self.hit_boxes is not None:
+                self.hit_boxes.apply(texture, *key)
+            else:
+                texture.hit_box_points
+            self._textures[key] = texture
+            return texture
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """The hit and miss counters, and the number of cached textures."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "atlas_misses": self.atlas_misses,
+            "textures": len(self._textures),
+        }
+
+    def clear(self) -> None:
+        """Drop every cached texture and reset the counters."""
+        with self._lock:
+            self._textures.clear()
+            self.hits = 0
+            self.misses = 0
+            self.atlas_misses = 0
+
+
+# Process-wide texture cache, which can be passed to CustomTileMap to reuse textures
+# across maps. Its textures are cut from the game's packed atlas, if it was built, and their
+# hit boxes come from the game's hit box cache.
+SHARED_TEXTURE_CACHE = TileTextureCache(asset_atlas.DEFAULT_ATLAS, hit_box_cache.DEFAULT_CACHE)
+
+
+class AnimationClip:
+    """
+    The frames of an animated tile, shared by every sprite of that tile, and the clock that
+    animates them. Every sprite of a clip shows the same frame. update() advances the clock
+    once for all of them, and only changes their textures when the frame changes, so a field
+    of animated tiles costs one update per clip rather than one per sprite.
+    :param List[AnimationKeyframe] frames: The frames, with their durations in milliseconds.
+    Attributes:
+        :sprites: The sprites showing the clip. Sprites that aren't used anywhere else are dropped.
+        :frame_index: The index of the frame being shown.
+        :time: How far into the clip the clock is, in milliseconds.
+    """
+
+    def __init__(self, frames: List[AnimationKeyframe]) -> None:
+        self.frames = frames
+        self._frame_ends = list(accumulate(frame.duration for frame in frames))
+        self.sprites: "weakref.WeakSet[Sprite]" = weakref.WeakSet()
+        self.frame_index = 0
+        self.time = 0.0
+
+    def add(self, sprite: Sprite) -> None:
+        """Show the clip on a sprite."""
+        self.sprites.add(sprite)
+        sprite.texture = self.frames[self.frame_index].texture
+
+    def update(self, delta_time: float) -> bool:
+        """Advance the clock, in seconds. Returns whether the frame changed."""
+        duration = self._frame_ends[-1] if self._frame_ends else 0
+        if not duration:
+            return False
+        self.time = (self.time + delta_time * 1000) % duration
+        frame_index = bisect_right(self._frame_ends, self.time)
+        if frame_index == self.frame_index:
+            return False
+
+        self.frame_index = frame_index
+        texture = self.frames[frame_index].texture
+        for sprite in self.sprites:
+            sprite.texture = texture
+        return True
+
+
+class TileLayerChunks:
+    """
+    The sprites of a tile layer, split into square chunks of tiles with a SpriteList each,
+    so drawing can skip the chunks that are off screen.
+    Attributes:
+        :chunk_size: The width and height of a chunk, in tiles.
+        :chunks: A dictionary mapping each chunk's SpriteList to its (column, row) in chunks,
+                 counted from the top left of the map like the tile rows.
+        :bounds: A dictionary mapping each chunk's (left, bottom, right, top) pixel bounds to its
+                 (column, row). The bounds cover every sprite in the chunk.
+    """
+
+    def __init__(self, chunk_size: int) -> None:
+        self.chunk_size = chunk_size
+        self.chunks: Dict[Tuple[int, int], SpriteList] = OrderedDict()
+        self.bounds: Dict[Tuple[int, int], Tuple[float, float, float, float]] = {}
+
+    def add(self, column: int, row: int, sprite: Sprite, sprite_list_factory) -> None:
+        """Add a sprite to the chunk of the tile at column and row, creating the chunk if needed."""
+        key = (column // self.chunk_size, row // self.chunk_size)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self.chunks[key] = sprite_list_factory()
+            self.bounds[key] = (sprite.left, sprite.bottom, sprite.right, sprite.top)
+        else:
+            left, bottom, right, top = self.bounds[key]
+            self.bounds[key] = (
+                min(left, sprite.left),
+                min(bottom, sprite.bottom),
+                max(right, sprite.right),
+                max(top, sprite.top),
+            )
+        chunk.append(sprite)
+
+    def get_visible_chunks(
+        self, left: float, bottom: float, right: float, top: float
+    ) -> List[SpriteList]:
+        """Get the chunks that intersect a rectangle, like the camera's viewport."""
+        return [
+            self.chunks[key]
+            for key, (chunk_left, chunk_bottom, chunk_right, chunk_top) in self.bounds.items()
+            if chunk_left < right and chunk_right > left and chunk_bottom < top and chunk_top > bottom
+        ]
+
+    @property
+    def sprite_count(self) -> int:
+        return sum(len(chunk) for chunk in self.chunks.values())
+
+
+class InfiniteTileLayerChunks(TileLayerChunks):
+    """
+    The chunks of a tile layer of an infinite map. A chunk is only decoded and turned into
+    sprites once update() finds it near the camera, and its sprites are dropped again once it
+    is far away, so the sprites in memory depend on the area around the camera rather than
+    on the size of the map.
+    The chunks are the ones Tiled stored the layer in, which form a regular grid. update()
+    only looks up the chunks of the grid cells around the camera and the chunks that are
+    loaded, so its cost doesn't grow with the size of the map either.
+    Only the loaded chunks are in chunks and bounds, and their sprites are also in the layer's
+    full SpriteList.
+    :param int chunk_size: The width and height of a chunk, in tiles.
+    :param Tuple[float, float] chunk_pixel_size: The width and height of a chunk, in pixels.
+    :param Tuple[float, float] origin: The left and top of the chunk at (0, 0), in pixels.
+    :param SpriteList sprite_list: The layer's full SpriteList.
+    :param Dict[Tuple[int, int], Tuple[Tuple[float, float, float, float], pytiled_parser.Chunk]] areas:
+           The (left, bottom, right, top) pixel bounds of every chunk of the layer, and the chunk,
+           by the chunk's (column, row) in chunks.
+    :param load_chunk: Called with a chunk to create its sprites.
+    :param sprite_list_factory: Called to create the SpriteList of a loaded chunk.
+    Attributes:
+        :loads: How many times a chunk was loaded.
+        :releases: How many times a chunk was released.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int,
+        chunk_pixel_size: Tuple[float, float],
+        origin: Tuple[float, float],
+        sprite_list: SpriteList,
+        areas: Dict[Tuple[int, int], Tuple[Tuple[float, float, float, float], pytiled_parser.Chunk]],
+        load_chunk: Callable[[pytiled_parser.Chunk], List[Sprite]],
+        sprite_list_factory: Callable[[], SpriteList],
+    ) -> None:
+        super().__init__(chunk_size)
+        self.chunk_pixel_size = chunk_pixel_size
+        self.origin = origin
+        self.sprite_list = sprite_list
+        self.areas = areas
+        self._load_chunk = load_chunk
+        self._sprite_list_factory = sprite_list_factory
+        self.loads = 0
+        self.releases = 0
+
+    def update(
+        self,
+        left: float,
+        bottom: float,
+        right: float,
+        top: float,
+        load_distance: float,
+        release_distance: float,
+    ) -> Tuple[int, int]:
+        """
+        Load the chunks within the load distance of a rectangle, like the camera's viewport, and
+        release the chunks beyond the release distance. Returns how many chunks were loaded
+        and released.
+        """
+        def distance_to(area: Tuple[float, float, float, float]) -> float:
+            area_left, area_bottom, area_right, area_top = area
+            return math.hypot(
+                max(area_left - right, 0, left - area_right),
+                max(area_bottom - top, 0, bottom - area_top),
+            )
+
+        released_keys = [key for key, area in self.bounds.items() if distance_to(area) > release_distance]
+        if released_keys:
+            self._release(released_keys)
+
+        loaded = 0
+        if not self.areas:
+            return loaded, len(released_keys)
+        chunk_width, chunk_height = self.chunk_pixel_size
+        origin_left, origin_top = self.origin
+        # Chunk rows are counted down from the top, like the tile rows
+        first_column = math.floor((left - load_distance - origin_left) / chunk_width)
+        last_column = math.floor((right + load_distance - origin_left) / chunk_width)
+        first_row = math.floor((origin_top - top - load_distance) / chunk_height)
+        last_row = math.floor((origin_top - bottom + load_distance) / chunk_height)
+        for column in range(first_column, last_column + 1):
+            for row in range(first_row, last_row + 1):
+                key = (column, row)
+                if key in self.chunks:
+                    continue
+                area_chunk = self.areas.get(key)
+                if area_chunk is not None and distance_to(area_chunk[0]) <= load_distance:
+                    self._load(key, *area_chunk)
+                    loaded += 1
+        return loaded, len(released_keys)
+
+    def _load(
+        self,
+        key: Tuple[int, int],
+        area: Tuple[float, float, float, float],
+        chunk: pytiled_parser.Chunk,
+    ) -> None:
+        chunk_list = self.chunks[key] = self._sprite_list_factory()
+        self.bounds[key] = area
+        for sprite in self._load_chunk(chunk):
+            chunk_list.append(sprite)
+            self.sprite_list.append(sprite)
+        # The sprites are made, the decoded tile data isn't needed until the chunk is loaded again
+        if isinstance(chunk.data, pytiled_parser.LazyTileGrid):
+            chunk.data.release()
+        self.loads += 1
+
+    def _release(self, keys: List[Tuple[int, int]]) -> None:
+        released_sprites = set()
+        for key in keys:
+            released_sprites.update(self.chunks.pop(key))
+            del self.bounds[key]
+        # Removing sprites one at a time searches the list for each of them, rebuild it once instead
+        kept_sprites = [sprite for sprite in self.sprite_list if sprite not in released_sprites]
+        self.sprite_list.clear()
+        self.sprite_list.extend(kept_sprites)
+        self.releases += len(keys)
+
+
 class CustomTileMap:
     """
     Class that represents a fully parsed and loaded map from Tiled.
@@ -112,6 +456,8 @@ class CustomTileMap:
     :param Optional[arcade.TextureAtlas] texture_atlas: A default texture atlas to use for the
             SpriteLists created by this map. If not supplied the global default atlas will be used.
     :param bool lazy: SpriteLists will be created lazily.
+    :param Optional[TileTextureCache] texture_cache: The cache to take tile textures from.
+            If not supplied, a new cache is created for this map.
     The `layer_options` parameter can be used to specify per layer arguments.
     The available options for this are:
         use_spatial_hash - A boolean to enable spatial hashing on this layer's SpriteList.
@@ -124,6 +470,16 @@ class CustomTileMap:
         custom_class_args - Custom arguments, passed into the constructor of the custom_class
         texture_atlas - A texture atlas to use for the SpriteList from this layer, if none is \
                         supplied then the one defined at the map level will be used.
+        chunk_size - Only for tile layers. If set, the layer's sprites are also split into square \
+                     chunks of this many tiles, stored in chunked_layers, so only the chunks on \
+                     screen need to be drawn. The layer's full SpriteList is then created lazily, \
+                     since it is only used for collisions.
+    Animated tiles are animated by the AnimationClip of their tileset tile, in animation_clips,
+    which update_animations() advances. Sprites of a custom class keep animating themselves, so
+    only the layers that aren't in plain_tile_layers need their update_animation() called.
+    Tile layers of infinite maps are always chunked, with the chunks Tiled saved them in. Their
+    chunks are only turned into sprites by update_infinite_layers(), which should be called with
+    the camera's viewport every frame. The game's levels can't be infinite maps, see Simulation.
         For example:
         code-block::
             layer_options = {
@@ -153,6 +509,18 @@ class CustomTileMap:
         :object_lists: A dictionary mapping TiledObjects to their layer names. This is used
                        for all object layers of the map.
         :offset: A tuple containing the X and Y position offset values.
+        :texture_cache: The TileTextureCache the tile textures of this map come from.
+        :objects_by_id: A dictionary mapping the TiledObjects of all object layers to their IDs.
+        :objects_by_name: A dictionary mapping lists of TiledObjects to their names.
+        :objects_by_class: A dictionary mapping lists of TiledObjects to their classes.
+        :chunked_layers: A dictionary mapping TileLayerChunks to the names of the tile layers
+                         that have a chunk_size, and InfiniteTileLayerChunks to the names of the
+                         tile layers of an infinite map.
+        :animation_clips: A dictionary mapping the AnimationClip of every animated tile to the
+                          (firstgid of its tileset, tile ID).
+        :plain_tile_layers: The names of the tile layers without a custom class. Their sprites
+                            don't animate themselves, their animated tiles are animated by
+                            the animation clips.
     """
 
     def __init__(
@@ -167,6 +535,7 @@ class CustomTileMap:
         offset: Vec2 = Vec2(0, 0),
         texture_atlas: Optional["TextureAtlas"] = None,
         lazy: bool = False,
+        texture_cache: Optional[TileTextureCache] = None,
     ) -> None:
         """
         Given a .json file, this will read in a Tiled map file, and
@@ -186,12 +555,6 @@ class CustomTileMap:
             # This attribute stores the pytiled-parser map object
             self.tiled_map = pytiled_parser.parse_map(map_file)
 
-        if self.tiled_map.infinite:
-            raise AttributeError(
-                "Attempted to load an infinite TileMap. Arcade currently cannot load "
-                "infinite maps. Disable the infinite map property and re-save the file."
-            )
-
         if not texture_atlas:
             try:
                 texture_atlas = get_window().ctx.default_atlas
@@ -217,8 +580,26 @@ class CustomTileMap:
         # Dictionaries to store the SpriteLists for processed layers
         self.sprite_lists: Dict[str, SpriteList] = OrderedDict()
         self.object_lists: Dict[str, List[TiledObject]] = OrderedDict()
+        self.chunked_layers: Dict[str, TileLayerChunks] = OrderedDict()
+        self.animation_clips: Dict[Tuple[int, int], AnimationClip] = {}
+        self.plain_tile_layers: Set[str] = set()
         self.properties = self.tiled_map.properties
 
+        # Indexes of every object in the object layers, filled in as the layers are processed
+        self.objects_by_id: Dict[int, TiledObject] = {}
+        self.objects_by_name: Dict[str, List[TiledObject]] = {}
+        self.objects_by_class: Dict[str, List[TiledObject]] = {}
+
+        # Sorted firstgids of every tileset, so the tileset owning a GID can be found
+        # with a binary search, and a cache of resolved tiles keyed by the raw GID
+        # (flip flags included), so a GID repeated across the map is resolved once.
+        self._tileset_firstgids: List[int] = sorted(self.tiled_map.tilesets.keys())
+        self._tile_cache: Dict[int, Optional[pytiled_parser.Tile]] = {}
+
+        # Textures are shared by every tile sprite cut from the same image region
+        self.texture_cache = texture_cache if texture_cache is not None else TileTextureCache()
+        self._image_sources: Dict[Any, Optional[Path]] = {}
+
         global_options = {  # type: ignore
             "scaling": self.scaling,
             "use_spatial_hash": self.use_spatial_hash,
@@ -228,6 +609,7 @@ class CustomTileMap:
             "custom_class": None,
             "custom_class_args": {},
             "texture_atlas": texture_atlas,
+            "chunk_size": None,
         }
 
         for layer in self.tiled_map.layers:
@@ -279,6 +661,35 @@ class CustomTileMap:
             for sub_layer in layer.layers:
                 self._process_layer(sub_layer, global_options, layer_options)
 
+    def update_animations(self, delta_time: float) -> None:
+        """Advance the clocks of the animated tiles, in seconds."""
+        for clip in self.animation_clips.values():
+            clip.update(delta_time)
+
+    def update_infinite_layers(
+        self,
+        left: float,
+        bottom: float,
+        right: float,
+        top: float,
+        load_distance: float,
+        release_distance: float,
+    ) -> Tuple[int, int]:
+        """
+        Load the chunks of the infinite tile layers near a rectangle, like the camera's viewport,
+        and release the ones far from it. See InfiniteTileLayerChunks.update(). Does nothing if
+        the map isn't infinite.
+        """
+        loaded = released = 0
+        for chunks in self.chunked_layers.values():
+            if isinstance(chunks, InfiniteTileLayerChunks):
+                layer_loaded, layer_released = chunks.update(
+                    left, bottom, right, top, load_distance, release_distance
+                )
+                loaded += layer_loaded
+                released += layer_released
+        return loaded, released
+
     def get_cartesian(
         self,
         x: float,
@@ -298,6 +709,28 @@ class CustomTileMap:
 
         return x, y
 
+    def get_object_by_id(self, object_id: int) -> Optional[TiledObject]:
+        """
+        Get the object with the given ID from any object layer of the map.
+        Returns None if there is no such object.
+        :param int object_id: The ID of the object, as shown in Tiled.
+        """
+        return self.objects_by_id.get(object_id)
+
+    def get_objects_by_name(self, name: str) -> List[TiledObject]:
+        """
+        Get every object with the given name from the object layers of the map.
+        :param str name: The name of the objects.
+        """
+        return self.objects_by_name.get(name, [])
+
+    def get_objects_by_class(self, class_: str) -> List[TiledObject]:
+        """
+        Get every object with the given class from the object layers of the map.
+        :param str class_: The Tiled class of the objects.
+        """
+        return self.objects_by_class.get(class_, [])
+
     def get_tilemap_layer(self, layer_path: str) -> Optional[pytiled_parser.Layer]:
         assert isinstance(layer_path, str)
 
@@ -317,6 +750,18 @@ class CustomTileMap:
         return layer
 
     def _get_tile_by_gid(self, tile_gid: int) -> Optional[pytiled_parser.Tile]:
+        """
+        Get the tile for a GID, including its flip flags. The returned tile is shared
+        by every cell with the same GID, so it must not be modified.
+        """
+        try:
+            return self._tile_cache[tile_gid]
+        except KeyError:
+            tile = self._resolve_tile_by_gid(tile_gid)
+            self._tile_cache[tile_gid] = tile
+            return tile
+
+    def _resolve_tile_by_gid(self, tile_gid: int) -> Optional[pytiled_parser.Tile]:
         flipped_diagonally = False
         flipped_horizontally = False
         flipped_vertically = False
@@ -333,59 +778,51 @@ class CustomTileMap:
             flipped_vertically = True
             tile_gid -= _FLIPPED_VERTICALLY_FLAG
 
-        for tileset_key, tileset in self.tiled_map.tilesets.items():
-            if tile_gid < tileset_key:
-                continue
-
-            # No specific tile info, but there is a tile sheet
-            # print(f"data {tileset_key} {tileset.tiles} {tileset.image} {tileset_key} {tile_gid} {tileset.tile_count}")  # noqa
-            if (
-                tileset.image is not None
-                and tileset_key <= tile_gid < tileset_key + tileset.tile_count
-            ):
-                tile_id = tile_gid - tileset_key
-                existing_ref = None
-                if tileset.tiles is not None:
-                    if (tile_gid - tileset_key) in tileset.tiles:
+        # The owning tileset is the one with the highest firstgid not above the GID
+        index = bisect_right(self._tileset_firstgids, tile_gid) - 1
+        tile_ref = None
+        if index >= 0:
+            tileset_key = self._tileset_firstgids[index]
+            tileset = self.tiled_map.tilesets[tileset_key]
+            tile_id = tile_gid - tileset_key
+
+            if tileset.image is not None:
+                if tile_id < tileset.tile_count:
+                    existing_ref = None
+                    if tileset.tiles is not None and tile_id in tileset.tiles:
                         existing_ref = tileset.tiles[tile_id]
                         existing_ref.image = tileset.image
 
-                # No specific tile info, but there is a tile sheet
-                if existing_ref:
-                    tile_ref = existing_ref
-                else:
-                    tile_ref = pytiled_parser.Tile(
-                        id=(tile_id), image=tileset.image
-                    )
-            elif tileset.tiles is None and tileset.image is not None:
-                # Not in this tileset, move to the next
-                continue
-            else:
-                if tileset.tiles is None:
-                    return None
-                tile_ref = tileset.tiles.get(tile_gid - tileset_key)
-
-            if tile_ref:
-                my_tile = copy.copy(tile_ref)
-                my_tile.tileset = tileset
-                my_tile.flipped_vertically = flipped_vertically
-                my_tile.flipped_diagonally = flipped_diagonally
-                my_tile.flipped_horizontally = flipped_horizontally
-                return my_tile
+                    # No specific tile info, but there is a tile sheet
+                    if existing_ref:
+                        tile_ref = existing_ref
+                    else:
+                        tile_ref = pytiled_parser.Tile(id=tile_id, image=tileset.image)
+            elif tileset.tiles is not None:
+                tile_ref = tileset.tiles.get(tile_id)
+
+        if tile_ref:
+            my_tile = copy.copy(tile_ref)
+            my_tile.tileset = tileset
+            my_tile.flipped_vertically = flipped_vertically
+            my_tile.flipped_diagonally = flipped_diagonally
+            my_tile.flipped_horizontally = flipped_horizontally
+            return my_tile
 
         print(f"Returning NO tile for {tile_gid}.")
         return None
 
-    def _get_tile_by_id(
-        self, tileset: pytiled_parser.Tileset, tile_id: int
-    ) -> Optional[pytiled_parser.Tile]:
-        for tileset_key, cur_tileset in self.tiled_map.tilesets.items():
-            if cur_tileset is tileset:
-                for tile_key, tile in cur_tileset.tiles.items():
-                    if tile_id == tile.id:
-                        return tile
-
-        return None
+    def _get_image_source(
+        self, tile: pytiled_parser.Tile, map_directory: Optional[str]
+    ) -> Optional[Path]:
+        """Find the image file for a tile, checking the filesystem once per image."""
+        image = tile.image or tile.tileset.image
+        try:
+            return self._image_sources[image]
+        except KeyError:
+            image_file = _get_image_source(tile, map_directory)
+            self._image_sources[image] = image_file
+            return image_file
 
     def _create_sprite_from_tile(
         self,
@@ -401,12 +838,11 @@ class CustomTileMap:
         # --- Step 1, Find a reference to an image this is going to be based off of
         map_source = self.tiled_map.map_file
         map_directory = os.path.dirname(map_source)
-        image_file = _get_image_source(tile, map_directory)
+        image_file = self._get_image_source(tile, map_directory)
 
+        clip: Optional[AnimationClip] = None
         if tile.animation:
-            if not custom_class:
-                custom_class = AnimatedTimeBasedSprite
-            elif not issubclass(custom_class, AnimatedTimeBasedSprite):
+            if custom_class and not issubclass(custom_class, AnimatedTimeBasedSprite):
                 raise RuntimeError(
                     f"""
                     Tried to use a custom class {custom_class.__name__} for animated tiles
@@ -414,9 +850,15 @@ class CustomTileMap:
                     Custom classes for animated tiles must subclass AnimatedTimeBasedSprite.
                     """
                 )
-            # print(custom_class.__name__)
-            args = {"filename": image_file, "scale": scaling}
-            my_sprite = custom_class(**custom_class_args, **args)  # type: ignore
+            clip = self._get_animation_clip(tile)
+            args = {
+                "scale": scaling,
+                "texture": clip.frames[0].texture,
+                "hit_box_algorithm": hit_box_algorithm,
+                "hit_box_detail": hit_box_detail,
+            }
+            # Without a custom class, the clip animates the sprite, so it can be a plain Sprite
+            my_sprite = (custom_class or Sprite)(**custom_class_args, **args)  # type: ignore
         else:
             if not custom_class:
                 custom_class = Sprite
@@ -429,16 +871,21 @@ class CustomTileMap:
                     """
                 )
             image_x, image_y, width, height = _get_image_info_from_tileset(tile)
+            texture = self.texture_cache.get_texture(
+                image_file,  # type: ignore
+                image_x,
+                image_y,
+                width,
+                height,
+                flipped_horizontally=tile.flipped_horizontally,
+                flipped_vertically=tile.flipped_vertically,
+                flipped_diagonally=tile.flipped_diagonally,
+                hit_box_algorithm=hit_box_algorithm,
+                hit_box_detail=hit_box_detail,
+            )
             args = {
-                "filename": image_file,
                 "scale": scaling,
-                "image_x": image_x,
-                "image_y": image_y,
-                "image_width": width,
-                "image_height": height,
-                "flipped_horizontally": tile.flipped_horizontally,
-                "flipped_vertically": tile.flipped_vertically,
-                "flipped_diagonally": tile.flipped_diagonally,
+                "texture": texture,
                 "hit_box_algorithm": hit_box_algorithm,  # type: ignore
                 "hit_box_detail": hit_box_detail,
             }
@@ -549,44 +996,42 @@ class CustomTileMap:
 
                 my_sprite.hit_box = points
 
-        if tile.animation:
-            key_frame_list = []
-            for frame in tile.animation:
-                frame_tile = self._get_tile_by_id(tile.tileset, frame.tile_id)
-                if frame_tile:
-                    image_file = _get_image_source(frame_tile, map_directory)
-
-                    if frame_tile.image and image_file:
-                        texture = load_texture(image_file)
-                    elif not frame_tile.image and image_file:
-                        # No image for tile, pull from tilesheet
-                        (
-                            image_x,
-                            image_y,
-                            width,
-                            height,
-                        ) = _get_image_info_from_tileset(frame_tile)
-
-                        texture = load_texture(
-                            image_file, image_x, image_y, width, height
-                        )
-                    else:
-                        raise RuntimeError(
-                            f"Warning: failed to load image for animation frame for "
-                            f"tile '{frame_tile.id}', '{image_file}'."
-                        )
+        if clip is not None:
+            if isinstance(my_sprite, AnimatedTimeBasedSprite):
+                my_sprite.frames = clip.frames
+            else:
+                clip.add(my_sprite)
 
-                    key_frame = AnimationKeyframe(  # type: ignore
-                        frame.tile_id, frame.duration, texture
-                    )
-                    key_frame_list.append(key_frame)
+        return my_sprite
 
-                    if len(key_frame_list) == 1:
-                        my_sprite.texture = key_frame.texture
+    def _get_animation_clip(self, tile: pytiled_parser.Tile) -> AnimationClip:
+        """Get the clip of an animated tile, loading its frames the first time."""
+        key = (tile.tileset.firstgid, tile.id)  # type: ignore
+        clip = self.animation_clips.get(key)
+        if clip is not None:
+            return clip
+
+        map_directory = os.path.dirname(self.tiled_map.map_file)
+        key_frame_list = []
+        for frame in tile.animation:  # type: ignore
+            frame_tile = self._get_tile_by_gid(tile.tileset.firstgid + frame.tile_id)  # type: ignore
+            image_file = frame_tile and self._get_image_source(frame_tile, map_directory)
+            if not image_file:
+                raise RuntimeError(
+                    f"Warning: failed to load image for animation frame for "
+                    f"tile '{frame.tile_id}' of tile '{tile.id}'."
+                )
 
-            cast(AnimatedTimeBasedSprite, my_sprite).frames = key_frame_list
+            image_x, image_y, width, height = _get_image_info_from_tileset(frame_tile)
+            texture = self.texture_cache.get_texture(
+                image_file, image_x, image_y, width or 0, height or 0
+            )
+            key_frame_list.append(
+                AnimationKeyframe(frame.tile_id, frame.duration, texture)  # type: ignore
+            )
 
-        return my_sprite
+        clip = self.animation_clips[key] = AnimationClip(key_frame_list)
+        return clip
 
     def _process_image_layer(
         self,
@@ -599,6 +1044,7 @@ class CustomTileMap:
         offset: Vec2 = Vec2(0, 0),
         custom_class: Optional[type] = None,
         custom_class_args: Dict[str, Any] = {},
+        chunk_size: Optional[int] = None,  # Not used, put here for compatibility
     ) -> SpriteList:
 
         sprite_list: SpriteList = SpriteList(
@@ -619,28 +1065,21 @@ class CustomTileMap:
                 )
             image_file = try2
 
-        my_texture = load_texture(
-            image_file,
-            hit_box_algorithm=hit_box_algorithm,
-            hit_box_detail=hit_box_detail,
-        )
-
         if layer.transparent_color:
-            data = my_texture.image.getdata()
-
-            target = layer.transparent_color
-            new_data = []
-            for item in data:
-                if (
-                    item[0] == target[0]
-                    and item[1] == target[1]
-                    and item[2] == target[2]
-                ):
-                    new_data.append((255, 255, 255, 0))
-                else:
-                    new_data.append(item)
-
-            my_texture.image.putdata(new_data)
+            # The keyed image is a texture of its own, so the cached texture of the image is left as it is
+            red, green, blue = layer.transparent_color[:3]
+            my_texture = Texture(
+                f"{image_file}-keyed-{red:02x}{green:02x}{blue:02x}",
+                image=transparent_color.load_keyed_image(image_file, layer.transparent_color),
+                hit_box_algorithm=hit_box_algorithm,
+                hit_box_detail=hit_box_detail,
+            )
+        else:
+            my_texture = load_texture(
+                image_file,
+                hit_box_algorithm=hit_box_algorithm,
+                hit_box_detail=hit_box_detail,
+            )
 
         if not custom_class:
             custom_class = Sprite
@@ -683,6 +1122,122 @@ class CustomTileMap:
         sprite_list.append(my_sprite)
         return sprite_list
 
+    def _create_tile_layer_sprite(
+        self,
+        layer: pytiled_parser.TileLayer,
+        item: int,
+        column_index: int,
+        row_index: int,
+        scaling: float,
+        hit_box_algorithm: str,
+        hit_box_detail: float,
+        offset: Vec2,
+        custom_class: Optional[type],
+        custom_class_args: Dict[str, Any],
+    ) -> Optional[Sprite]:
+        """Create the sprite of a tile of a tile layer, at its column and row of the map."""
+        tile = self._get_tile_by_gid(item)
+        if tile is None:
+            raise ValueError(
+                (
+                    f"Couldn't find tile for item {item} in layer "
+                    f"'{layer.name}' in file '{self.tiled_map.map_file}'"
+                    f"at ({column_index}, {row_index})."
+                )
+            )
+
+        my_sprite = self._create_sprite_from_tile(
+            tile,
+            scaling=scaling,
+            hit_box_algorithm=hit_box_algorithm,
+            hit_box_detail=hit_box_detail,
+            custom_class=custom_class,
+            custom_class_args=custom_class_args,
+        )
+
+        if my_sprite is None:
+            print(
+                f"Warning: Could not create sprite number {item} in layer '{layer.name}' {tile.image}"
+            )
+            return None
+
+        my_sprite.center_x = (
+            column_index * (self.tiled_map.tile_size[0] * scaling)
+            + my_sprite.width / 2
+        ) + offset[0]
+        my_sprite.center_y = (
+            (self.tiled_map.map_size.height - row_index - 1)
+            * (self.tiled_map.tile_size[1] * scaling)
+            + my_sprite.height / 2
+        ) + offset[1]
+
+        # Tint
+        if layer.tint_color:
+            my_sprite.color = layer.tint_color
+
+        # Opacity
+        opacity = layer.opacity
+        if opacity:
+            my_sprite.alpha = int(opacity * 255)
+
+        return my_sprite
+
+    def _create_infinite_layer_chunks(
+        self,
+        layer: pytiled_parser.TileLayer,
+        sprite_list: SpriteList,
+        sprite_list_factory: Callable[[], SpriteList],
+        sprite_options: Dict[str, Any],
+    ) -> InfiniteTileLayerChunks:
+        """Lay out the chunks of a tile layer of an infinite map, without creating any sprites."""
+        scaling = sprite_options["scaling"]
+        offset = sprite_options["offset"]
+        tile_width = self.tiled_map.tile_size[0] * scaling
+        tile_height = self.tiled_map.tile_size[1] * scaling
+
+        areas = {}
+        chunk_size = chunk_rows = 0
+        for chunk in layer.chunks:  # type: ignore
+            chunk_size = chunk_size or chunk.size.width
+            chunk_rows = chunk_rows or chunk.size.height
+            column, row = chunk.coordinates.x, chunk.coordinates.y
+            left = column * tile_width + offset[0]
+            top = (self.tiled_map.map_size.height - row) * tile_height + offset[1]
+            area = (
+                left,
+                top - chunk.size.height * tile_height,
+                left + chunk.size.width * tile_width,
+                top,
+            )
+            areas[(column // chunk.size.width, row // chunk.size.height)] = (area, chunk)
+
+        def load_chunk(chunk: pytiled_parser.Chunk) -> List[Sprite]:
+            sprites = []
+            for row_index, row in enumerate(chunk.data):
+                for column_index, item in enumerate(row):
+                    if item == 0:
+                        continue
+                    my_sprite = self._create_tile_layer_sprite(
+                        layer,
+                        item,
+                        chunk.coordinates.x + column_index,
+                        chunk.coordinates.y + row_index,
+                        **sprite_options,
+                    )
+                    if my_sprite is not None:
+                        sprites.append(my_sprite)
+            return sprites
+
+        return InfiniteTileLayerChunks(
+            chunk_size,
+            (chunk_size * tile_width, chunk_rows * tile_height),
+            (offset[0], self.tiled_map.map_size.height * tile_height + offset[1]),
+            sprite_list,
+            areas,
+            load_chunk,
+            sprite_list_factory,
+        )
+
     def _process_tile_layer(
         self,
         layer: pytiled_parser.TileLayer,
@@ -694,70 +1249,59 @@ class CustomTileMap:
         offset: Vec2 = Vec2(0, 0),
         custom_class: Optional[type] = None,
         custom_class_args: Dict[str, Any] = {},
+        chunk_size: Optional[int] = None,
     ) -> SpriteList:
 
         sprite_list: SpriteList = SpriteList(
             use_spatial_hash=use_spatial_hash,
             atlas=texture_atlas,
-            lazy=self._lazy,
+            # A chunked layer is drawn through its chunks, so this list never has to be on the GPU
+            lazy=self._lazy or bool(chunk_size) or layer.chunks is not None,
         )
-        map_array = layer.data
+        sprite_list.visible = layer.visible
+        if layer.properties:
+            sprite_list.properties = layer.properties
+
+        sprite_options = {
+            "scaling": scaling,
+            "hit_box_algorithm": hit_box_algorithm,
+            "hit_box_detail": hit_box_detail,
+            "offset": offset,
+            "custom_class": custom_class,
+            "custom_class_args": custom_class_args,
+        }
+
+        def sprite_list_factory() -> SpriteList:
+            return SpriteList(atlas=texture_atlas, lazy=self._lazy)
+
+        if not custom_class:
+            self.plain_tile_layers.add(layer.name)
+
+        if layer.chunks is not None:
+            self.chunked_layers[layer.name] = self._create_infinite_layer_chunks(
+                layer, sprite_list, sprite_list_factory, sprite_options
+            )
+            return sprite_list
+
+        chunks: Optional[TileLayerChunks] = None
+        if chunk_size:
+            chunks = TileLayerChunks(chunk_size)
+            self.chunked_layers[layer.name] = chunks
 
         # Loop through the layer and add in the list
-        for row_index, row in enumerate(map_array):
+        for row_index, row in enumerate(layer.data):
             for column_index, item in enumerate(row):
                 # Check for an empty tile
                 if item == 0:
                     continue
 
-                tile = self._get_tile_by_gid(item)
-                if tile is None:
-                    raise ValueError(
-                        (
-                            f"Couldn't find tile for item {item} in layer "
-                            f"'{layer.name}' in file '{self.tiled_map.map_file}'"
-                            f"at ({column_index}, {row_index})."
-                        )
-                    )
-
-                my_sprite = self._create_sprite_from_tile(
-                    tile,
-                    scaling=scaling,
-                    hit_box_algorithm=hit_box_algorithm,
-                    hit_box_detail=hit_box_detail,
-                    custom_class=custom_class,
-                    custom_class_args=custom_class_args,
+                my_sprite = self._create_tile_layer_sprite(
+                    layer, item, column_index, row_index, **sprite_options
                 )
-
-                if my_sprite is None:
-                    print(
-                        f"Warning: Could not create sprite number {item} in layer '{layer.name}' {tile.image}"
-                    )
-                else:
-                    my_sprite.center_x = (
-                        column_index * (self.tiled_map.tile_size[0] * scaling)
-                        + my_sprite.width / 2
-                    ) + offset[0]
-                    my_sprite.center_y = (
-                        (self.tiled_map.map_size.height - row_index - 1)
-                        * (self.tiled_map.tile_size[1] * scaling)
-                        + my_sprite.height / 2
-                    ) + offset[1]
-
-                    # Tint
-                    if layer.tint_color:
-                        my_sprite.color = layer.tint_color
-
-                    # Opacity
-                    opacity = layer.opacity
-                    if opacity:
-                        my_sprite.alpha = int(opacity * 255)
-
-                    sprite_list.visible = layer.visible
+                if my_sprite is not None:
                     sprite_list.append(my_sprite)
-
-                if layer.properties:
-                    sprite_list.properties = layer.properties
+                    if chunks is not None:
+                        chunks.add(column_index, row_index, my_sprite, sprite_list_factory)
 
         return sprite_list
 
@@ -774,6 +1318,7 @@ class CustomTileMap:
         hit_box_detail: float = 4.5,
         custom_class: Optional[type] = None,
         custom_class_args: Dict[str, Any] = {},
+        chunk_size: Optional[int] = None,
     ) -> Tuple[Optional[SpriteList], Optional[List[TiledObject]]]:
 
         if not scaling:
@@ -880,6 +1425,12 @@ class CustomTileMap:
 
                 objects_list.append(tiled_object)
 
+                self.objects_by_id[cur_object.id] = tiled_object
+                if cur_object.name:
+                    self.objects_by_name.setdefault(cur_object.name, []).append(tiled_object)
+                if cur_object.class_:
+                    self.objects_by_class.setdefault(cur_object.class_, []).append(tiled_object)
+
         return sprite_list or None, objects_list or None
 
 
@@ -893,6 +1444,8 @@ def load_tilemap(
     offset: Vec2 = Vec2(0, 0),
     texture_atlas: Optional["TextureAtlas"] = None,
     lazy: bool = False,
+    texture_cache: Optional[TileTextureCache] = None,
+    tiled_map: Optional[pytiled_parser.TiledMap] = None,
 ) -> CustomTileMap:
     """
     Given a .json map file, loads in and returns a `TileMap` object.
@@ -913,6 +1466,9 @@ def load_tilemap(
             within the map. This will be applied in addition to any offsets from Tiled. This value
             can be overridden with the layer_options dict.
     :param bool lazy: SpriteLists will be created lazily.
+    :param Optional[TileTextureCache] texture_cache: The cache to take tile textures from.
+    :param pytiled_parser.TiledMap tiled_map: An already parsed map, for example one loaded
+            from the map cache. Passing this means that ``map_file`` will not be parsed.
     """
     return CustomTileMap(
         map_file=map_file,
@@ -924,6 +1480,8 @@ def load_tilemap(
         offset=offset,
         texture_atlas=texture_atlas,
         lazy=lazy,
+        texture_cache=texture_cache,
+        tiled_map=tiled_map,
     )
 
 
@@ -0,0 +1,78 @@
+"""
+Debug text, drawn with persistent labels.
+
+arcade.draw_text lays out its text again every time it's called. The HUD keeps one pyglet
+label per line in a batch instead, only changes a label when its text changes, and draws
+every line with one batch draw.
+"""
+
+from typing import List
+
+import arcade
+import pyglet
+
+
+class DebugHUD:
+    """
+    Lines of debug text, stacked up from the bottom left corner of the screen.
+    Every frame, call begin(), then line() for each line, then draw().
+    :param arcade.Window window: The window to draw in.
+    :param float start_x: The x position of the lines.
+    :param float start_y: The y position of the first line.
+    :param float line_height: The distance between lines.
+    :param float font_size: The font size of the text.
+    :param arcade.Color color: The color of the text.
+    """
+
+    def __init__(self, window: arcade.Window, start_x: float = 10, start_y: float = 10, line_height: float = 30,
+                 font_size: float = 18, color: arcade.Color = arcade.csscolor.WHITE):
+        self.window = window
+        self.start_x = start_x
+        self.start_y = start_y
+        self.line_height = line_height
+        self.font_size = font_size
+        self.color = (*color[:3], 255)
+        self.batch = pyglet.graphics.Batch()
+        self._labels: List[pyglet.text.Label] = []
+        # The text of every label, so it can be compared without asking pyglet
+        self._texts: List[str] = []
+        self._line_count = 0
+        # How many labels were created or changed since the HUD was made
+        self.rebuilds = 0
+
+    def begin(self):
+        """Start a new frame of lines."""
+        self._line_count = 0
+
+    def line(self, item, value):
+        """Add a line, showing an item and its value."""
+        text = f"{item}: {value}"
+        index = self._line_count
+        self._line_count += 1
+
+        if index == len(self._labels):
+            self._labels.append(pyglet.text.Label(
+                text,
+                x=self.start_x,
+                y=self.start_y + index * self.line_height,
+                font_size=self.font_size,
+                color=self.color,
+                batch=self.batch,
+            ))
+            self._texts.append(text)
+            self.rebuilds += 1
+        elif self._texts[index] != text:
+            self._labels[index].text = text
+            self._texts[index] = text
+            self.rebuilds += 1
+
+    def draw(self):
+        """Draw the lines added since begin()."""
+        # Lines that weren't added this frame, like after hiding some debug text, are removed
+        for label in self._labels[self._line_count:]:
+            label.delete()
+        del self._labels[self._line_count:]
+        del self._texts[self._line_count:]
+
+        with self.window.ctx.pyglet_rendering():
+            self.batch.draw()
@@ -0,0 +1,148 @@
+"""
+Physics for every enemy at once.
+
+The state of all enemies is kept as struct-of-arrays: one typed array per field, indexed by
+enemy. A step patrols, applies gravity and moves every enemy, resolving collisions against
+a TileSpriteGrid of the solid tiles. The enemy sprites are only written to at the end of the
+step, so the cost of an enemy is a few array reads and tile lookups, and not a collision
+check against every platform sprite list.
+"""
+
+from array import array
+from typing import List
+
+import arcade
+
+from collisions import EMPTY_TILE, CollisionStats, TileSpriteGrid
+from constants import GRAVITY
+
+# The kind of every tile in the solid grid
+SOLID_TILE = 1
+
+
+class EnemyPhysics:
+    """
+    Moves enemies that patrol between their boundaries, fall with gravity and stand on
+    solid tiles. Like arcade.PhysicsEnginePlatformer, an enemy walking into a wall first
+    tries to climb it by its speed, so it can walk up one-pixel steps and ramps.
+    :param TileSpriteGrid solids: The solid tiles. They must not move.
+    :param float gravity: How much the vertical speed drops every step.
+    """
+
+    def __init__(self, solids: TileSpriteGrid, gravity: float = GRAVITY):
+        self.solids = solids
+        self.gravity = gravity
+        self.stats = CollisionStats()
+        self.sprites: List[arcade.Sprite] = []
+
+        # Positions are the centers of the sprites, and the offsets give their bounding boxes
+        self.center_x = array("d")
+        self.center_y = array("d")
+        self.change_x = array("d")
+        self.change_y = array("d")
+        self.speed = array("d")
+        self.boundary_left = array("d")
+        self.boundary_right = array("d")
+        self.left_offset = array("d")
+        self.right_offset = array("d")
+        self.bottom_offset = array("d")
+        self.top_offset = array("d")
+
+    @classmethod
+    def from_sprite_lists(cls, solids: TileSpriteGrid, *sprite_lists: arcade.SpriteList) -> "EnemyPhysics":
+        """
+        Create the physics for the solid tiles of some sprite lists.
+        :param TileSpriteGrid solids: An empty grid to put the solid tiles in.
+        :param arcade.SpriteList sprite_lists: Sprite lists of static, tile aligned sprites.
+        """
+        for sprite_list in sprite_lists:
+            for sprite in sprite_list:
+                try:
+                    kind = solids.get_kind(sprite)
+                except ValueError as error:
+                    print(f"Warning, {error} Enemies won't collide with it.")
+                    continue
+                # Tiles of several of the sprite lists can overlap, the tile only needs to be solid once
+                if kind == EMPTY_TILE:
+                    solids.add(sprite, SOLID_TILE)
+        return cls(solids)
+
+    def add(self, enemy: arcade.Sprite):
+        """
+        Add an enemy. It needs ``speed``, ``boundary_left`` and ``boundary_right`` attributes.
+        Its position and speed are read now, and are owned by this class from then on.
+        """
+        self.sprites.append(enemy)
+        self.center_x.append(enemy.center_x)
+        self.center_y.append(enemy.center_y)
+        self.change_x.append(enemy.change_x)
+        self.change_y.append(enemy.change_y)
+        self.speed.append(enemy.speed)
+        self.boundary_left.append(enemy.boundary_left)
+        self.boundary_right.append(enemy.boundary_right)
+        self.left_offset.append(enemy.left - enemy.center_x)
+        self.right_offset.append(enemy.right - enemy.center_x)
+        self.bottom_offset.append(enemy.bottom - enemy.center_y)
+        self.top_offset.append(enemy.top - enemy.center_y)
+
+    def _hits(self, index: int, x: float, y: float) -> List[int]:
+        return self.solids.query(
+            x + self.left_offset[index],
+            y + self.bottom_offset[index],
+            x + self.right_offset[index],
+            y + self.top_offset[index],
+            self.stats,
+        )
+
+    def update(self):
+        """Move every enemy by one step, and write the results to their sprites."""
+        self.stats.reset()
+        solids = self.solids
+        for index in range(len(self.sprites)):
+            x = self.center_x[index]
+            y = self.center_y[index]
+            change_x = self.change_x[index]
+
+            # Turn around at the patrol boundaries
+            speed = self.speed[index]
+            if x + self.right_offset[index] > self.boundary_right[index] and change_x > 0:
+                change_x = -speed
+            if x + self.left_offset[index] < self.boundary_left[index] and change_x < 0:
+                change_x = speed
+
+            # Move vertically, landing on or bumping into solid tiles
+            change_y = self.change_y[index] - self.gravity
+            y += change_y
+            hits = self._hits(index, x, y)
+            if hits:
+                self.stats.hits += len(hits)
+                if change_y < 0:
+                    y = max(solids.tops[hit] for hit in hits) - self.bottom_offset[index]
+                else:
+                    y = min(solids.bottoms[hit] for hit in hits) - self.top_offset[index]
+                change_y = 0
+
+            # Move horizontally, climbing small steps and stopping at walls
+            x += change_x
+            hits = self._hits(index, x, y)
+            if hits:
+                self.stats.hits += len(hits)
+                climb = abs(change_x)
+                if self._hits(index, x, y + climb):
+                    if change_x > 0:
+                        x = min(solids.lefts[hit] for hit in hits) - self.right_offset[index]
+                    else:
+                        x = max(solids.rights[hit] for hit in hits) - self.left_offset[index]
+                else:
+                    y += climb
+
+            self.center_x[index] = x
+            self.center_y[index] = y
+            self.change_x[index] = change_x
+            self.change_y[index] = change_y
+
+        for index, enemy in enumerate(self.sprites):
+            enemy.center_x = self.center_x[index]
+            enemy.center_y = self.center_y[index]
+            enemy.change_x = self.change_x[index]
+            enemy.change_y = self.change_y[index]
@@ -0,0 +1,137 @@
+"""
+A process-wide registry of character textures.
+
+Every character, like the player or a battle bot, has a folder of animation frames. The
+registry loads each folder once, with the horizontally flipped variant of every frame, and
+every sprite of that character shares the same textures and hit box. Frames in the packed
+atlas are cut from it instead of being loaded from their files, see asset_atlas.py.
+"""
+
+import os
+from typing import Dict, List, Optional, Tuple
+
+import arcade
+
+from asset_atlas import DEFAULT_ATLAS, PackedAtlas
+import hit_box_cache
+
+TexturePair = Tuple[arcade.Texture, arcade.Texture]
+
+
+class CharacterTextures:
+    """
+    The animation frames of a character, loaded from a folder with idle1.png, fall1.png,
+    jump1.png, walk1.png, walk2.png and so on, and climb1.png, climb2.png and so on.
+    Only idle1.png is required.
+    Texture pairs hold the frame facing right, then the frame flipped to face left.
+    Climbing frames aren't flipped.
+    :param TextureRegistry registry: The registry that loads the textures.
+    :param str images_path: The folder of the frames.
+    """
+
+    def __init__(self, registry: "TextureRegistry", images_path: str):
+        self.images_path = images_path
+        self._registry = registry
+        self.idle: TexturePair = self._load_pair("idle1.png")
+        self.fall: Optional[TexturePair] = self._load_pair("fall1.png", required=False)
+        self.jump: Optional[TexturePair] = self._load_pair("jump1.png", required=False)
+        self.walk: List[TexturePair] = [self._load_pair(name) for name in self._find_frames("walk")]
+        self.climb: List[arcade.Texture] = [self._registry.load(self._path(name)) for name in self._find_frames("climb")]
+
+    def _path(self, file_name: str) -> str:
+        return f"{self.images_path}/{file_name}"
+
+    def _find_frames(self, prefix: str) -> List[str]:
+        """Find the numbered frames of an animation, until a number is missing."""
+        frames = []
+        while os.path.exists(self._path(f"{prefix}{len(frames) + 1}.png")):
+            frames.append(f"{prefix}{len(frames) + 1}.png")
+        return frames
+
+    def _load_pair(self, file_name: str, required: bool = True) -> Optional[TexturePair]:
+        path = self._path(file_name)
+        if not required and not os.path.exists(path):
+            return None
+        return self._registry.load(path), self._registry.load(path, flipped_horizontally=True)
+
+    @property
+    def textures(self) -> List[arcade.Texture]:
+        """Every texture of the character."""
+        textures = list(self.idle)
+        for pair in (self.fall, self.jump, *self.walk):
+            if pair is not None:
+                textures.extend(pair)
+        textures.extend(self.climb)
+        return textures
+
+
+class TextureRegistry:
+    """
+    Loads the textures of every character once, keyed by the character's images folder.
+    :param Optional[PackedAtlas] atlas: The atlas to cut the textures from, when they are in it.
+    :param Optional[hit_box_cache.HitBoxCache] hit_boxes: The cache to take the hit boxes from.
+    Attributes:
+        :loads: How many textures were loaded from their own files.
+        :atlas_loads: How many textures were cut from the atlas.
+        :hits: How many characters were handed out without loading anything.
+    """
+
+    def __init__(self, atlas: Optional[PackedAtlas] = None, hit_boxes: Optional[hit_box_cache.HitBoxCache] = None):
+        self.atlas = atlas
+        self.hit_boxes = hit_boxes
+        self._characters: Dict[str, CharacterTextures] = {}
+        self.loads = 0
+        self.atlas_loads = 0
+        self.hits = 0
+
+    def load(self, file_name: str, flipped_horizontally: bool = False) -> arcade.Texture:
+        """Load one texture, counting the load."""
+        if self.atlas is not None and file_name in self.atlas:
+            self.atlas_loads += 1
+            texture = self.atlas.get_texture(file_name, flipped_horizontally=flipped_horizontally)
+        else:
+            self.loads += 1
+            texture = arcade.load_texture(file_name=file_name, flipped_horizontally=flipped_horizontally)
+        # Work out the hit box now, so every sprite using the texture shares it
+        if self.hit_boxes is not None:
+            self.hit_boxes.apply(texture, file_name, flipped_horizontally=flipped_horizontally)
+        else:
+            texture.hit_box_points
+        return texture
+
+    def get(self, images_path: str) -> CharacterTextures:
+        """Get the textures of a character, loading them the first time."""
+        images_path = os.path.normpath(images_path)
+        characters = self._characters.get(images_path)
+        if characters is not None:
+            self.hits += 1
+            return characters
+        characters = self._characters[images_path] = CharacterTextures(self, images_path)
+        return characters
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """The counters, the number of characters and textures, and the bytes of image data they hold."""
+        textures = [texture for characters in self._characters.values() for texture in characters.textures]
+        image_bytes = sum(
+            texture.image.width * texture.image.height * len(texture.image.getbands()) for texture in textures
+        )
+        return {
+            "characters": len(self._characters),
+            "textures": len(textures),
+            "loads": self.loads,
+            "atlas_loads": self.atlas_loads,
+            "hits": self.hits,
+            "image_bytes": image_bytes,
+        }
+
+    def clear(self):
+        """Drop every character's textures and reset the counters."""
+        self._characters.clear()
+        self.loads = 0
+        self.atlas_loads = 0
+        self.hits = 0
+
+
+# Shared by every entity, see player.py
+ENTITY_TEXTURES = TextureRegistry(DEFAULT_ATLAS, hit_box_cache.DEFAULT_CACHE)
@@ -0,0 +1,217 @@
+"""
+An on-disk cache of texture hit boxes, so they aren't computed from the pixels of the
+images every time the game starts. "Detailed" hit boxes in particular are slow to compute.
+
+A hit box is stored under the content hash of its image file, the rectangle of the image
+the texture was cut from, the flips applied to it, and the hit box algorithm and detail.
+A rectangle covering the whole image is stored like the whole image, so tiles of image
+collection tilesets, which are cut from their images with their full size, find the hit
+boxes prewarmed for the whole images.
+Editing an image changes its hash, so its old hit boxes are never used again.
+
+New hit boxes are written back to the cache file when the game exits. Prewarm the cache
+for every image of the game from the project root:
+
+    python src/hit_box_cache.py [--assets src/assets]
+"""
+
+import argparse
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple, Union
+
+import arcade
+import PIL.Image
+
+from constants import HIT_BOX_CACHE_FILE
+
+CACHE_VERSION = 2
+
+HitBox = Tuple[Tuple[float, float], ...]
+
+# The image hash of every file, with the modification time and size it was hashed at
+_file_hashes: Dict[str, Tuple[int, int, str]] = {}
+# The width and height of every image, with the modification time and size of its file
+_image_sizes: Dict[str, Tuple[int, int, Tuple[int, int]]] = {}
+
+
+def hash_image_file(image_file: Union[str, Path]) -> str:
+    """The content hash of an image file. Each file is only read again once it changed."""
+    path = os.path.abspath(image_file)
+    stat = os.stat(path)
+    known = _file_hashes.get(path)
+    if known is not None and known[:2] == (stat.st_mtime_ns, stat.st_size):
+        return known[2]
+    with open(path, "rb") as file:
+        digest = hashlib.sha256(file.read()).hexdigest()
+    _file_hashes[path] = (stat.st_mtime_ns, stat.st_size, digest)
+    return digest
+
+
+def get_image_size(image_file: Union[str, Path]) -> Tuple[int, int]:
+    """The width and height of an image. Each file is only read again once it changed."""
+    path = os.path.abspath(image_file)
+    stat = os.stat(path)
+    known = _image_sizes.get(path)
+    if known is not None and known[:2] == (stat.st_mtime_ns, stat.st_size):
+        return known[2]
+    # Opening an image only reads its header
+    with PIL.Image.open(path) as image:
+        size = image.size
+    _image_sizes[path] = (stat.st_mtime_ns, stat.st_size, size)
+    return size
+
+
+class HitBoxCache:
+    """
+    Hit boxes by image hash, rectangle, flips and algorithm, kept in a JSON file. A cache
+    can be used from several threads, like the level preloader's worker and the main thread.
+    :param Union[str, Path] cache_file: The file to keep the hit boxes in.
+    Attributes:
+        :hits: How many hit boxes were taken from the cache.
+        :misses: How many hit boxes had to be computed.
+    """
+
+    def __init__(self, cache_file: Union[str, Path] = HIT_BOX_CACHE_FILE):
+        self.cache_file = Path(cache_file)
+        self._hit_boxes: Dict[str, HitBox] = {}
+        # The level preloader and world streaming workers add hit boxes while the main thread
+        # may be adding or saving them too
+        self._lock = threading.Lock()
+        self._changed = False
+        self.hits = 0
+        self.misses = 0
+
+        try:
+            with open(self.cache_file) as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as error:
+            print(f"Warning, can't read hit box cache file {self.cache_file}: {error}")
+            return
+        if data.get("version") == CACHE_VERSION:
+            self._hit_boxes = {key: tuple(map(tuple, points)) for key, points in data["hit_boxes"].items()}
+
+    @staticmethod
+    def get_key(
+        image_file: Union[str, Path],
+        image_x: float = 0,
+        image_y: float = 0,
+        width: float = 0,
+        height: float = 0,
+        flipped_horizontally: bool = False,
+        flipped_vertically: bool = False,
+        flipped_diagonally: bool = False,
+        hit_box_algorithm: str = "Simple",
+        hit_box_detail: float = 4.5,
+    ) -> str:
+        # The detail only changes Detailed hit boxes
+        if hit_box_algorithm != "Detailed":
+            hit_box_detail = 0
+        # A rectangle covering the whole image is the whole image
+        if (image_x, image_y) == (0, 0) and (width, height) == get_image_size(image_file):
+            width = height = 0
+        flips = f"{flipped_horizontally:d}{flipped_vertically:d}{flipped_diagonally:d}"
+        return (f"{hash_image_file(image_file)}:{image_x:g},{image_y:g},{width:g},{height:g}:"
+                f"{flips}:{hit_box_algorithm}:{hit_box_detail:g}")
+
+    def apply(self, texture: arcade.Texture, image_file: Union[str, Path], *args, **kwargs) -> HitBox:
+        """
+        Give a texture its hit box from the cache, or compute it and add it to the cache. The
+        texture must have been loaded from the image file with the same rectangle, flips and
+        hit box settings, which are passed like to arcade.load_texture().
+        """
+        key = self.get_key(image_file, *args, **kwargs)
+        with self._lock:
+            hit_box = self._hit_boxes.get(key)
+            if hit_box is not None:
+                self.hits += 1
+                texture._hit_box_points = hit_box
+                return hit_box
+            self.misses += 1
+
+        hit_box = tuple((float(x), float(y)) for x, y in texture.hit_box_points)
+        with self._lock:
+            self._hit_boxes[key] = hit_box
+            self._changed = True
+        return hit_box
+
+    def save(self):
+        """Write the cache file, if any hit boxes were added since it was read or saved."""
+        with self._lock:
+            if not self._changed:
+                return
+            data = {"version": CACHE_VERSION, "hit_boxes": dict(self._hit_boxes)}
+            self._changed = False
+        try:
+            os.makedirs(self.cache_file.parent, exist_ok=True)
+            temp_file = self.cache_file.with_suffix(f".{os.getpid()}.tmp")
+            with open(temp_file, "w") as file:
+                json.dump(data, file, separators=(",", ":"))
+            os.replace(temp_file, self.cache_file)
+        except OSError as error:
+            print(f"Warning, can't write hit box cache file {self.cache_file}: {error}")
+
+    def __len__(self):
+        return len(self._hit_boxes)
+
+    def __repr__(self):
+        return f"HitBoxCache(hit_boxes={len(self)}, hits={self.hits}, misses={self.misses})"
+
+
+# The game's hit box cache, saved when the game exits
+DEFAULT_CACHE = HitBoxCache()
+atexit.register(DEFAULT_CACHE.save)
+
+
+def prewarm(
+    assets_dir: Union[str, Path],
+    hit_box_cache: HitBoxCache = DEFAULT_CACHE,
+    hit_box_algorithms: Iterable[str] = ("Simple", "Detailed"),
+    hit_box_detail: float = 4.5,
+) -> List[Path]:
+    """
+    Compute the hit boxes of every PNG under a directory, facing right and flipped to face
+    left, with each algorithm. Returns the images.
+    """
+    image_files = sorted(Path(assets_dir).rglob("*.png"))
+    for image_file in image_files:
+        for hit_box_algorithm in hit_box_algorithms:
+            for flipped_horizontally in (False, True):
+                texture = arcade.load_texture(
+                    image_file,
+                    flipped_horizontally=flipped_horizontally,
+                    hit_box_algorithm=hit_box_algorithm,
+                    hit_box_detail=hit_box_detail,
+                )
+                hit_box_cache.apply(
+                    texture,
+                    image_file,
+                    flipped_horizontally=flipped_horizontally,
+                    hit_box_algorithm=hit_box_algorithm,
+                    hit_box_detail=hit_box_detail,
+                )
+    return image_files
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Compute the hit boxes of every image ahead of time.")
+    arg_parser.add_argument("--assets", default="src/assets", help="The directory of the images")
+    arg_parser.add_argument("--hit-box-detail", type=float, default=4.5, help="The detail of Detailed hit boxes")
+    args = arg_parser.parse_args()
+
+    start = time.perf_counter()
+    image_files = prewarm(args.assets, hit_box_detail=args.hit_box_detail)
+    DEFAULT_CACHE.save()
+    print(f"Prewarmed the hit boxes of {len(image_files)} images in {time.perf_counter() - start:.2f} s, "
+          f"{DEFAULT_CACHE.misses} computed, {DEFAULT_CACHE.hits} already cached")
+
+
+if __name__ == "__main__":
+    main()
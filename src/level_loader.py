@@ -0,0 +1,148 @@
+"""
+Loading levels, and preloading the next level in the background.
+
+Once the player gets near the goal, the next level's map is parsed and its CustomTileMap built
+on a worker thread, with lazy sprite lists since OpenGL can only be used from the main thread.
+While the player finishes the level, the window uploads a few of those sprite lists to the GPU
+every frame. Reaching the goal then only has to assemble the scene from the prepared map.
+
+The worker fills custom_tilemap.SHARED_TEXTURE_CACHE and hit_box_cache.DEFAULT_CACHE, which the
+main thread uses too. Both caches lock their updates. If preloading fails, the level is loaded
+again on the main thread when it is reached.
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional
+
+from arcade import SpriteList
+
+from constants import *
+import custom_tilemap
+import map_cache
+
+# Layer specific options for the tilemap
+LAYER_OPTIONS = {
+    PLATFORMS_LAYER: {
+        "use_spatial_hash": True,
+        "chunk_size": CHUNK_SIZE
+    },
+    MOVING_PLATFORMS_LAYER: {
+        "use_spatial_hash": False,
+        "chunk_size": CHUNK_SIZE
+    },
+    OBJECTS_LAYER: {
+        "use_spatial_hash": True
+    },
+    ENEMIES_LAYER: {
+        "use_spatial_hash": False
+    }
+}
+
+
+def get_map_path(map_name: str) -> str:
+    return f"src/assets/tilemap_project/tilemaps/{map_name}.tmx"
+
+
+def load_level_tilemap(map_name: str, lazy: bool = False) -> custom_tilemap.CustomTileMap:
+    """
+    Load the tilemap of a level.
+    The parsed map comes from the map cache, and tile textures are kept in the shared cache, so
+    restarting a level doesn't parse the map or reload the textures again.
+    """
+    map_path = get_map_path(map_name)
+    return custom_tilemap.load_tilemap(
+        map_path,
+        TILE_SCALING,
+        LAYER_OPTIONS,
+        lazy=lazy,
+        texture_cache=custom_tilemap.SHARED_TEXTURE_CACHE,
+        tiled_map=map_cache.load_map(map_path),
+    )
+
+
+def _get_drawn_sprite_lists(tile_map: custom_tilemap.CustomTileMap) -> List[SpriteList]:
+    """The sprite lists of a tilemap that get drawn, which are the ones that need to be on the GPU."""
+    sprite_lists = []
+    for name, sprite_list in tile_map.sprite_lists.items():
+        chunks = tile_map.chunked_layers.get(name)
+        if chunks is None:
+            sprite_lists.append(sprite_list)
+        else:
+            sprite_lists.extend(chunks.chunks.values())
+    return sprite_lists
+
+
+class LevelPreloader:
+    """
+    Builds the tilemap of one level ahead of time on a worker thread.
+    Attributes:
+        :stats: How many levels were preloaded, how many setups used a preloaded level, how
+                many of those had to wait for it to finish, how many preloads failed, and how
+                many sprite lists were uploaded ahead of time.
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="level-preloader")
+        self._map_name: Optional[str] = None
+        self._future: Optional[Future] = None
+        self._pending_uploads: Optional[List[SpriteList]] = None
+        self.stats = {"preloads": 0, "used": 0, "waited": 0, "failed": 0, "uploads": 0}
+
+    @property
+    def requested(self) -> Optional[str]:
+        """The name of the map being preloaded, if any."""
+        return self._map_name
+
+    def request(self, map_name: str):
+        """Start preloading a level, unless it is already being preloaded."""
+        if self._map_name == map_name:
+            return
+        self._map_name = map_name
+        self._future = self._executor.submit(load_level_tilemap, map_name, True)
+        self._pending_uploads = None
+        self.stats["preloads"] += 1
+
+    def take(self, map_name: str) -> Optional[custom_tilemap.CustomTileMap]:
+        """
+        Get the preloaded tilemap of a level, waiting for it if it is still loading. Returns None
+        if that level wasn't requested, or if preloading it failed, so the caller loads it itself.
+        A preloaded tilemap can only be taken once.
+        """
+        if self._map_name != map_name:
+            return None
+        future = self._future
+        self._map_name = None
+        self._future = None
+        self._pending_uploads = None
+
+        if not future.done():
+            self.stats["waited"] += 1
+        try:
+            tile_map = future.result()
+        except Exception as error:
+            self.stats["failed"] += 1
+            print(f"Warning, preloading {map_name} failed, loading it again: {error!r}")
+            return None
+        self.stats["used"] += 1
+        return tile_map
+
+    def upload(self, max_sprite_lists: int) -> int:
+        """
+        Upload up to a number of the preloaded tilemap's sprite lists to the GPU. Call this from the
+        main thread every frame. Returns the number of sprite lists uploaded.
+        """
+        if self._future is None or not self._future.done() or self._future.exception() is not None:
+            return 0
+        if self._pending_uploads is None:
+            self._pending_uploads = _get_drawn_sprite_lists(self._future.result())
+
+        count = 0
+        while self._pending_uploads and count < max_sprite_lists:
+            self._pending_uploads.pop().initialize()
+            count += 1
+        self.stats["uploads"] += count
+        return count
+
+    def close(self):
+        """Stop the worker thread."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,197 @@
+"""
+An on-disk cache of parsed Tiled maps, so a level can be reloaded without parsing its
+XML again.
+
+Each map gets one cache file, which stores:
+    - The content hash of the map and of every tileset and template it depends on.
+      The cache file is only used if all of them still match, so editing any of them
+      in Tiled invalidates it automatically.
+    - The parsed pytiled_parser.TiledMap, pickled.
+    - The tile grids of every tile layer, as raw uint32 buffers. These are pickled
+      out-of-band and are memory-mapped when the cache is loaded, so no tile data is
+      copied.
+
+The cache files are written by this game for this game. Like any pickle, they must not
+come from an untrusted source.
+"""
+
+import hashlib
+import html
+import json
+import mmap
+import os
+import pickle
+import re
+import struct
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import pytiled_parser
+from pytiled_parser.parsers.tmx.properties import ObjectID
+
+from constants import MAP_CACHE_DIR
+
+CACHE_VERSION = 4
+
+_MAGIC = b"TMAPCACH"
+# Magic, cache version and header length
+_PREFIX = struct.Struct("<8sII")
+_ALIGNMENT = 8
+
+# Attribute values in map, tileset and template files which reference other files
+_REFERENCE_PATTERN = re.compile(r'\b(?:source|template)"?\s*[=:]\s*"([^"]+)"')
+# Only these references can change the parsed map. Images are only stored as paths.
+_DEPENDENCY_SUFFIXES = (".tmx", ".tsx", ".tx", ".json", ".tmj", ".tsj", ".tj")
+
+
+class MapCacheStats:
+    """Counts how cached map loads went."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def __repr__(self):
+        return f"MapCacheStats(hits={self.hits}, misses={self.misses}, writes={self.writes})"
+
+
+stats = MapCacheStats()
+
+
+def _hash_file(file_path: Path) -> str:
+    with open(file_path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def _find_dependencies(map_file: Path) -> List[Path]:
+    """Find every tileset and template a map depends on, directly or through other files."""
+    dependencies: List[Path] = []
+    to_scan = [map_file]
+    seen = {map_file}
+    while to_scan:
+        file_path = to_scan.pop()
+        with open(file_path, encoding="utf-8") as file:
+            text = file.read()
+        for reference in _REFERENCE_PATTERN.findall(text):
+            dependency = Path(os.path.normpath(file_path.parent / html.unescape(reference)))
+            if dependency.suffix.lower() in _DEPENDENCY_SUFFIXES and dependency not in seen:
+                seen.add(dependency)
+                dependencies.append(dependency)
+                to_scan.append(dependency)
+    return dependencies
+
+
+def _get_cache_file(map_file: Path, cache_dir: Union[str, Path]) -> Path:
+    path_hash = hashlib.sha256(str(map_file).encode()).hexdigest()[:16]
+    return Path(cache_dir, f"{map_file.stem}-{path_hash}.mapcache")
+
+
+def _align(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def _read_cache(cache_file: Path, hashes: Dict[str, str]) -> Optional[pytiled_parser.TiledMap]:
+    """Load a map from a cache file, or return None if the file is missing or stale."""
+    try:
+        with open(cache_file, "rb") as file:
+            cache = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        magic, version, header_length = _PREFIX.unpack_from(cache)
+        if magic != _MAGIC or version != CACHE_VERSION:
+            return None
+        header = json.loads(cache[_PREFIX.size:_PREFIX.size + header_length])
+    except (struct.error, ValueError):
+        return None
+    if header["byteorder"] != sys.byteorder or header["parser_version"] != pytiled_parser.__version__:
+        return None
+
+    # The map itself is always the first entry, so a changed map is noticed before
+    # any of its dependencies are hashed.
+    for file_path, file_hash in header["hashes"].items():
+        if hashes.get(file_path) is None:
+            try:
+                hashes[file_path] = _hash_file(Path(file_path))
+            except OSError:
+                return None
+        if hashes[file_path] != file_hash:
+            return None
+
+    data = memoryview(cache)[_align(_PREFIX.size + header_length):]
+    pickle_start, pickle_length = header["pickle"]
+    buffers = [data[start:start + length] for start, length in header["buffers"]]
+    try:
+        return pickle.loads(data[pickle_start:pickle_start + pickle_length], buffers=buffers)
+    except Exception as error:
+        print(f"Warning, ignoring unreadable map cache file {cache_file}: {error}")
+        return None
+
+
+def _write_cache(cache_file: Path, tiled_map: pytiled_parser.TiledMap, hashes: Dict[str, str]):
+    buffers: List[pickle.PickleBuffer] = []
+    pickled = pickle.dumps(tiled_map, protocol=5, buffer_callback=buffers.append)
+
+    # Lay out the pickle followed by every buffer, each aligned so it can be viewed
+    # as uint32 straight from the memory map.
+    sections = [memoryview(pickled)] + [buffer.raw() for buffer in buffers]
+    offsets = []
+    offset = 0
+    for section in sections:
+        offsets.append([offset, section.nbytes])
+        offset = _align(offset + section.nbytes)
+
+    header = json.dumps({
+        "byteorder": sys.byteorder,
+        "parser_version": pytiled_parser.__version__,
+        "hashes": hashes,
+        "pickle": offsets[0],
+        "buffers": offsets[1:],
+    }).encode()
+
+    os.makedirs(cache_file.parent, exist_ok=True)
+    temp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+    with open(temp_file, "wb") as file:
+        file.write(_PREFIX.pack(_MAGIC, CACHE_VERSION, len(header)))
+        file.write(header)
+        data_start = _align(_PREFIX.size + len(header))
+        file.write(bytes(data_start - file.tell()))
+        for (start, _), section in zip(offsets, sections):
+            file.write(bytes(data_start + start - file.tell()))
+            file.write(section)
+    os.replace(temp_file, cache_file)
+
+
+def load_map(map_file: Union[str, Path], cache_dir: Union[str, Path] = MAP_CACHE_DIR) -> pytiled_parser.TiledMap:
+    """
+    Load a parsed map from the cache, parsing the map and caching it if the cache is
+    missing or out of date.
+    :param Union[str, Path] map_file: The Tiled map file to load.
+    :param Union[str, Path] cache_dir: The directory to keep cache files in.
+    """
+    map_file = Path(os.path.normpath(map_file))
+    cache_file = _get_cache_file(map_file, cache_dir)
+    hashes = {str(map_file): _hash_file(map_file)}
+
+    tiled_map = _read_cache(cache_file, hashes)
+    if tiled_map is not None:
+        stats.hits += 1
+    else:
+        stats.misses += 1
+        tiled_map = pytiled_parser.parse_map(map_file)
+        known_hashes = hashes
+        hashes = {str(map_file): known_hashes[str(map_file)]}
+        for dependency in _find_dependencies(map_file):
+            hashes[str(dependency)] = known_hashes.get(str(dependency)) or _hash_file(dependency)
+        try:
+            _write_cache(cache_file, tiled_map, hashes)
+            stats.writes += 1
+        except OSError as error:
+            print(f"Warning, can't write map cache file {cache_file}: {error}")
+
+    # Object properties look up their objects through the map that was parsed last
+    ObjectID.tilemap = tiled_map
+    return tiled_map
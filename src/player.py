@@ -1,18 +1,13 @@
+from typing import Optional
+
 import arcade
 
 from animations import Animation, WalkingAnimation
 from constants import *
+from entity_textures import ENTITY_TEXTURES
 import sounds
 
 
-def load_texture_pair(file_name):
-    """Load two textures from the filename, the first texture NOT flipped, the second texture flipped"""
-    return (
-        arcade.load_texture(file_name=file_name),
-        arcade.load_texture(file_name=file_name, flipped_horizontally=True)
-    )
-
-
 class UknownAnimationCaseError(Exception): pass
 
     
@@ -27,7 +22,9 @@ class Entity(arcade.Sprite):
 
         # ---- Load Textures ----
 
-        self.idle_texture_pair = load_texture_pair(f"{images_path}/idle1.png")
+        # Every entity of a kind shares the textures loaded by the registry
+        self.character_textures = ENTITY_TEXTURES.get(images_path)
+        self.idle_texture_pair = self.character_textures.idle
 
         # Set the initial texture
         self.texture = self.idle_texture_pair[0]
@@ -58,8 +55,8 @@ class Entity(arcade.Sprite):
 class EnemySprite(Entity):
     def __init__(self, images_path):
         super().__init__(images_path)
-        self.fall_texture_pair = load_texture_pair(f"{images_path}/fall1.png")
-        self.walk_textures = [load_texture_pair(f"{images_path}/walk{i+1}.png") for i in range(8)]
+        self.fall_texture_pair = self.character_textures.fall
+        self.walk_textures = self.character_textures.walk
 
         self.walk_anim = WalkingAnimation(self.walk_textures, max_player_speed=3)
 
@@ -104,13 +101,7 @@ class BattleBotEnemy(EnemySprite):
         self.center_y = center_y
         # Override EnemySprite animation to replace the max_player_speed parameter.
         self.walk_anim = WalkingAnimation(self.walk_textures, max_player_speed=self.speed)  
-
-    def on_update(self, delta_time):
-        if (self.right > self.boundary_right and self.change_x > 0):
-            self.change_x = -self.speed  # Turn left
-
-        if (self.left < self.boundary_left and self.change_x < 0):
-            self.change_x = self.speed  # Turn right
+        # Patrolling between the boundaries is done by EnemyPhysics
 
 
 class MissleBotEnemy(EnemySprite):
@@ -124,30 +115,27 @@ class MissleBotEnemy(EnemySprite):
         self.center_x = center_x
         self.center_y = center_y
         self.walk_anim = WalkingAnimation(self.walk_textures, max_player_speed=self.speed)
-
-    def on_update(self, delta_time):
+        # Patrolling between the boundaries is done by EnemyPhysics
         # TODO Make the missle_bot shoot missles
-        if (self.right > self.boundary_right and self.change_x > 0):
-            self.change_x = -self.speed  # Turn left
 
-        if (self.left < self.boundary_left and self.change_x < 0):
-            self.change_x = self.speed  # Turn right
-            
 
 class PlayerSprite(Entity):
-    def __init__(self):
+    def __init__(self, mixer: Optional[sounds.Mixer] = None):
         images_path = "src/assets/images/player"
         super().__init__(images_path)
 
+        # The mixer to play the player's sounds through, or None to play none
+        self.mixer = mixer
+
         self.jump_count = 0
         self.climbing = False
         self.jump_count = 0
         self.stop_jump = False
 
-        self.jump_texture_pair = load_texture_pair(f"{images_path}/jump1.png")
-        self.fall_texture_pair = load_texture_pair(f"{images_path}/fall1.png")
-        self.walk_textures = [load_texture_pair(f"{images_path}/walk{i+1}.png") for i in range(8)]
-        self.climb_textures = [arcade.load_texture(f"{images_path}/climb{i+1}.png") for i in range(4)]
+        self.jump_texture_pair = self.character_textures.jump
+        self.fall_texture_pair = self.character_textures.fall
+        self.walk_textures = self.character_textures.walk
+        self.climb_textures = self.character_textures.climb
 
         self.walk_anim = WalkingAnimation(self.walk_textures)
         self.climb_anim = Animation(self.climb_textures, use_right_left=False)
@@ -228,8 +216,8 @@ class PlayerSprite(Entity):
                  and not self.stop_jump:
                 self.change_y = PLAYER_JUMP_SPEED
                 self.jump_count += 1
-                if self.jump_count == 1:
-                    sounds.jump_sound.play()
+                if self.jump_count == 1 and self.mixer is not None:
+                    self.mixer.play(sounds.jump_sound)
             
             # Apply acceleration based on the keys pressed
             if self.left_pressed and not self.right_pressed:
@@ -0,0 +1,101 @@
+"""
+Frame timing, split into the phases of the game loop.
+
+Code is timed by wrapping it in a phase:
+
+    with profiler.phase(PHASE_COLLISIONS):
+        ...
+
+The time spent in each phase adds up over a frame, which can run several ticks, and every
+frame is kept as one sample in a ring buffer of the most recent frames. The samples give the
+percentiles shown in the profiler overlay, and can be exported to a CSV file to compare builds.
+"""
+
+import csv
+from collections import deque
+from time import perf_counter
+from typing import Dict, List, Tuple
+
+from constants import PROFILER_FRAMES
+
+PHASE_INPUT = "input"
+PHASE_PLAYER_PHYSICS = "player physics"
+PHASE_ENEMY_PHYSICS = "enemy physics"
+PHASE_COLLISIONS = "collisions"
+PHASE_ANIMATION = "animation"
+PHASE_DRAW = "draw"
+PHASES = (PHASE_INPUT, PHASE_PLAYER_PHYSICS, PHASE_ENEMY_PHYSICS, PHASE_COLLISIONS, PHASE_ANIMATION, PHASE_DRAW)
+# The whole frame, from the start of one frame to the start of the next
+FRAME = "frame"
+PERCENTILES = (50, 95, 99)
+
+
+class _Phase:
+    """Times a block of code and adds the time to its phase of the current frame."""
+
+    __slots__ = ("profiler", "index", "start")
+
+    def __init__(self, profiler: "FrameProfiler", index: int):
+        self.profiler = profiler
+        self.index = index
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.profiler.current[self.index] += perf_counter() - self.start
+
+
+class FrameProfiler:
+    """
+    Records how long each phase of the game loop took, for the most recent frames.
+    :param int frames: How many frames to keep samples for.
+    Attributes:
+        :samples: Samples of the recent frames. Each holds the seconds spent in every phase,
+                  in the order of PHASES, followed by the frame time.
+        :current: The seconds spent in every phase so far this frame.
+    """
+
+    def __init__(self, frames: int = PROFILER_FRAMES):
+        self.samples: deque = deque(maxlen=frames)
+        self.current: List[float] = [0.0] * len(PHASES)
+        self._phases: Dict[str, _Phase] = {name: _Phase(self, index) for index, name in enumerate(PHASES)}
+        self._frame_start = None
+
+    def phase(self, name: str) -> _Phase:
+        """Get the context manager that times a phase."""
+        return self._phases[name]
+
+    def end_frame(self):
+        """Store the current frame as a sample, and start a new frame."""
+        now = perf_counter()
+        frame_time = now - self._frame_start if self._frame_start is not None else sum(self.current)
+        self._frame_start = now
+        self.samples.append((*self.current, frame_time))
+        self.current = [0.0] * len(PHASES)
+
+    def percentiles(self) -> Dict[str, Tuple[float, ...]]:
+        """Get the 50th, 95th and 99th percentile of every phase and the frame time, in seconds."""
+        columns = list(zip(*self.samples)) or [()] * (len(PHASES) + 1)
+        results = {}
+        for name, values in zip((*PHASES, FRAME), columns):
+            values = sorted(values)
+            if values:
+                results[name] = tuple(values[min(len(values) * p // 100, len(values) - 1)] for p in PERCENTILES)
+            else:
+                results[name] = (0.0,) * len(PERCENTILES)
+        return results
+
+    def export(self, file_path: str):
+        """Write the samples to a CSV file, one row per frame, in milliseconds."""
+        with open(file_path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow([f"{name} ms" for name in (*PHASES, FRAME)])
+            for sample in self.samples:
+                writer.writerow([f"{seconds * 1000:.4f}" for seconds in sample])
+
+    def clear(self):
+        self.samples.clear()
+        self.current = [0.0] * len(PHASES)
+        self._frame_start = None
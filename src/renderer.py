@@ -0,0 +1,75 @@
+"""
+Draws a scene, culling the chunks of chunked tile layers that are outside the camera's view.
+
+Layers that CustomTileMap split into chunks (see the chunk_size layer option) are drawn one
+visible chunk at a time. Every other sprite list in the scene is drawn whole, like
+Scene.draw() does.
+"""
+
+from typing import Dict, Tuple
+
+import arcade
+
+from custom_tilemap import TileLayerChunks
+
+
+class RenderStats:
+    """Counts the drawing work done in the last frame."""
+
+    def __init__(self):
+        self.draw_calls = 0
+        self.sprites = 0
+        self.chunks_drawn = 0
+        self.chunks_culled = 0
+
+    def reset(self):
+        self.draw_calls = 0
+        self.sprites = 0
+        self.chunks_drawn = 0
+        self.chunks_culled = 0
+
+    def __repr__(self):
+        return (f"RenderStats(draw_calls={self.draw_calls}, sprites={self.sprites}, "
+                f"chunks_drawn={self.chunks_drawn}, chunks_culled={self.chunks_culled})")
+
+
+class SceneRenderer:
+    """Draws scenes in layer order, skipping chunks that are off screen."""
+
+    def __init__(self):
+        self.stats = RenderStats()
+
+    def _draw_sprite_list(self, sprite_list: arcade.SpriteList, pixelated: bool):
+        if len(sprite_list):
+            sprite_list.draw(pixelated=pixelated)
+            self.stats.draw_calls += 1
+            self.stats.sprites += len(sprite_list)
+
+    def draw(
+        self,
+        scene: arcade.Scene,
+        chunked_layers: Dict[str, TileLayerChunks],
+        viewport: Tuple[float, float, float, float],
+        pixelated: bool = False,
+    ):
+        """
+        Draw every visible sprite list of a scene.
+        :param arcade.Scene scene: The scene to draw.
+        :param Dict[str, TileLayerChunks] chunked_layers: The chunks of the scene's chunked layers, by layer name.
+        :param Tuple[float, float, float, float] viewport: The (left, bottom, right, top) of the area on screen.
+        :param bool pixelated: Draw the sprites without smoothing.
+        """
+        self.stats.reset()
+        for name, sprite_list in scene.name_mapping.items():
+            if not sprite_list.visible:
+                continue
+            chunks = chunked_layers.get(name)
+            if chunks is None:
+                self._draw_sprite_list(sprite_list, pixelated)
+                continue
+
+            visible_chunks = chunks.get_visible_chunks(*viewport)
+            self.stats.chunks_drawn += len(visible_chunks)
+            self.stats.chunks_culled += len(chunks.chunks) - len(visible_chunks)
+            for chunk in visible_chunks:
+                self._draw_sprite_list(chunk, pixelated)
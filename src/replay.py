@@ -0,0 +1,227 @@
+"""
+Recording and replaying the input of a game, tick by tick.
+
+The simulation is deterministic, so the input of every tick is all that's needed to play a
+game again. A replay file stores:
+    - The map the game was played on.
+    - The input of every tick, as one byte of key flags per tick, run-length encoded.
+    - A checksum of the game state every CHECKPOINT_INTERVAL ticks.
+
+Replaying runs the simulation headless as fast as possible and compares the checksums, so a
+replay is both a regression test, failing if a change alters the game, and a benchmark.
+
+Record a scripted run, and play it back, from the project root:
+
+    python src/replay.py record replay.bin [map name] [--ticks 10000]
+    python src/replay.py play replay.bin
+
+A game played in the window is recorded with ``python src/main.py --record replay.bin``.
+"""
+
+import argparse
+import struct
+import zlib
+from time import perf_counter
+from typing import Iterator, List, Tuple
+
+from constants import TICK_RATE
+from simulation import MAP_NAME, InputState, Simulation, walk_and_jump
+
+REPLAY_VERSION = 1
+CHECKPOINT_INTERVAL = 60
+
+_MAGIC = b"RPLY"
+# Magic, version, map name length, tick count, run count and checkpoint count
+_HEADER = struct.Struct("<4sHHIII")
+# Input flags and how many ticks in a row they were held for
+_RUN = struct.Struct("<BH")
+# Tick and state checksum
+_CHECKPOINT = struct.Struct("<II")
+
+_INPUT_FLAGS = (("up", 1), ("down", 2), ("left", 4), ("right", 8), ("god_mode", 16))
+
+
+class ReplayError(Exception): pass
+
+
+def input_to_flags(state: InputState) -> int:
+    return sum(flag for name, flag in _INPUT_FLAGS if getattr(state, name))
+
+
+def flags_to_input(flags: int) -> InputState:
+    return InputState(**{name: bool(flags & flag) for name, flag in _INPUT_FLAGS})
+
+
+def state_checksum(simulation: Simulation) -> int:
+    """A CRC-32 of everything the input can change: the player, the enemies, the score, level and deaths."""
+    player = simulation.player
+    physics = simulation.enemy_physics
+    checksum = zlib.crc32(struct.pack(
+        "<4d3I",
+        player.center_x,
+        player.center_y,
+        player.change_x,
+        player.change_y,
+        simulation.score,
+        simulation.level,
+        simulation.deaths,
+    ))
+    for values in (physics.center_x, physics.center_y, physics.change_x):
+        checksum = zlib.crc32(values.tobytes(), checksum)
+    return checksum
+
+
+class Replay:
+    """
+    The recorded input of a game.
+    :param str map_name: The map the game was played on.
+    """
+
+    def __init__(self, map_name: str = MAP_NAME):
+        self.map_name = map_name
+        # The input flags of every tick
+        self.inputs = bytearray()
+        # (tick, checksum) pairs, where the tick is the number of ticks run so far
+        self.checkpoints: List[Tuple[int, int]] = []
+
+    def __len__(self):
+        return len(self.inputs)
+
+    def record(self, simulation: Simulation):
+        """Record the tick the simulation just ran."""
+        self.inputs.append(input_to_flags(simulation.input))
+        if len(self.inputs) % CHECKPOINT_INTERVAL == 0:
+            self.checkpoints.append((len(self.inputs), state_checksum(simulation)))
+
+    def iter_inputs(self) -> Iterator[InputState]:
+        """Yield the input of every tick."""
+        states = {}
+        for flags in self.inputs:
+            if flags not in states:
+                states[flags] = flags_to_input(flags)
+            # Every tick gets its own copy, since the simulation's input can be changed in place
+            yield states[flags].copy()
+
+    def _runs(self) -> List[List[int]]:
+        runs = []
+        for flags in self.inputs:
+            if runs and runs[-1][0] == flags and runs[-1][1] < 0xFFFF:
+                runs[-1][1] += 1
+            else:
+                runs.append([flags, 1])
+        return runs
+
+    def save(self, file_path: str):
+        map_name = self.map_name.encode()
+        runs = self._runs()
+        with open(file_path, "wb") as file:
+            file.write(_HEADER.pack(
+                _MAGIC, REPLAY_VERSION, len(map_name), len(self.inputs), len(runs), len(self.checkpoints)
+            ))
+            file.write(map_name)
+            file.write(b"".join(_RUN.pack(flags, length) for flags, length in runs))
+            file.write(b"".join(_CHECKPOINT.pack(tick, checksum) for tick, checksum in self.checkpoints))
+
+    @classmethod
+    def load(cls, file_path: str) -> "Replay":
+        with open(file_path, "rb") as file:
+            data = file.read()
+        try:
+            magic, version, name_length, tick_count, run_count, checkpoint_count = _HEADER.unpack_from(data)
+        except struct.error:
+            raise ReplayError(f"{file_path} is not a replay file.")
+        if magic != _MAGIC:
+            raise ReplayError(f"{file_path} is not a replay file.")
+        if version != REPLAY_VERSION:
+            raise ReplayError(f"{file_path} is a version {version} replay, only version {REPLAY_VERSION} is supported.")
+
+        offset = _HEADER.size
+        replay = cls(data[offset:offset + name_length].decode())
+        offset += name_length
+        for flags, length in _RUN.iter_unpack(data[offset:offset + run_count * _RUN.size]):
+            replay.inputs.extend(bytes([flags]) * length)
+        offset += run_count * _RUN.size
+        replay.checkpoints = list(_CHECKPOINT.iter_unpack(data[offset:offset + checkpoint_count * _CHECKPOINT.size]))
+        if len(replay.inputs) != tick_count or len(replay.checkpoints) != checkpoint_count:
+            raise ReplayError(f"{file_path} is truncated.")
+        return replay
+
+
+class ReplayResult:
+    """The outcome of playing a replay."""
+
+    def __init__(self, simulation: Simulation, seconds: float, mismatches: List[int]):
+        self.simulation = simulation
+        self.seconds = seconds
+        # The ticks of the checkpoints whose checksum didn't match
+        self.mismatches = mismatches
+
+    @property
+    def ticks_per_second(self) -> float:
+        return self.simulation.ticks / self.seconds if self.seconds else 0.0
+
+    @property
+    def speedup(self) -> float:
+        """How many times faster than real time the replay ran."""
+        return self.ticks_per_second / TICK_RATE
+
+
+def play(replay: Replay) -> ReplayResult:
+    """Play a replay headless as fast as possible, checking the state at every checkpoint."""
+    simulation = Simulation(replay.map_name, headless=True)
+    simulation.setup()
+    checkpoints = dict(replay.checkpoints)
+    mismatches = []
+
+    start = perf_counter()
+    for state in replay.iter_inputs():
+        simulation.input = state
+        simulation.tick()
+        checksum = checkpoints.get(simulation.ticks)
+        if checksum is not None and checksum != state_checksum(simulation):
+            mismatches.append(simulation.ticks)
+    return ReplayResult(simulation, perf_counter() - start, mismatches)
+
+
+def record_script(map_name: str, inputs: Iterator[InputState]) -> Replay:
+    """Record a headless run of a scripted input."""
+    simulation = Simulation(map_name, headless=True)
+    simulation.setup()
+    replay = Replay(map_name)
+    for state in inputs:
+        simulation.input = state
+        simulation.tick()
+        replay.record(simulation)
+    return replay
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Record and play replays.")
+    subparsers = arg_parser.add_subparsers(dest="command", required=True)
+    record_parser = subparsers.add_parser("record", help="Record a walk-and-jump script.")
+    record_parser.add_argument("file")
+    record_parser.add_argument("map_name", nargs="?", default=MAP_NAME, help="A map in the tilemaps folder")
+    record_parser.add_argument("--ticks", type=int, default=10000, help="How many ticks to record")
+    play_parser = subparsers.add_parser("play", help="Play a replay headless and check its checkpoints.")
+    play_parser.add_argument("file")
+    args = arg_parser.parse_args()
+
+    if args.command == "record":
+        replay = record_script(args.map_name, walk_and_jump(args.ticks))
+        replay.save(args.file)
+        print(f"Recorded {len(replay)} ticks of {replay.map_name} with {len(replay.checkpoints)} checkpoints")
+        return
+
+    replay = Replay.load(args.file)
+    result = play(replay)
+    print(f"Played {len(replay)} ticks of {replay.map_name} in {result.seconds:.2f} s, "
+          f"{result.ticks_per_second:.0f} ticks per second, {result.speedup:.1f}x real time")
+    if result.mismatches:
+        print(f"State differs at {len(result.mismatches)} of {len(replay.checkpoints)} checkpoints, "
+              f"first at tick {result.mismatches[0]}")
+        raise SystemExit(1)
+    print(f"All {len(replay.checkpoints)} checkpoints match")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,425 @@
+"""
+The game simulation: loading a level, and the player, enemy and collision logic of every tick.
+
+It doesn't draw anything or need a window, so a level can be run headless, for tests, bots or
+benchmarks, as fast as the machine allows. The Game window in main.py drives the same
+simulation from the keyboard and draws it.
+
+Run a level headless from the project root, with the player walking right and jumping:
+
+    python src/simulation.py [map name] [--ticks 10000]
+"""
+
+import argparse
+from math import floor
+from time import perf_counter
+from typing import Iterable, Optional
+
+import arcade
+
+from player import PlayerSprite, BattleBotEnemy, MissleBotEnemy
+from constants import *
+from collisions import CollisionDispatcher, TileSpriteGrid
+from enemy_physics import EnemyPhysics
+from profiler import (
+    FrameProfiler,
+    PHASE_ANIMATION,
+    PHASE_COLLISIONS,
+    PHASE_ENEMY_PHYSICS,
+    PHASE_INPUT,
+    PHASE_PLAYER_PHYSICS,
+)
+from level_loader import LAYER_OPTIONS, LevelPreloader, load_level_tilemap
+import sounds
+
+TYPES_TO_LAYER = {
+    ("ladder",): LADDERS_LAYER,
+    ("coin",): COINS_LAYER,
+    ("lava",): DANGER_LAYER,
+    ("goal",): GOAL_LAYER,
+    ("blue_jump_pad", "green_jump_pad"): JUMP_PADS_LAYER
+}
+
+TYPES_TO_ENEMY = {
+    "battle_bot": BattleBotEnemy,
+    "missle_bot": MissleBotEnemy,
+}
+
+MAP_NAME = "basic_tilemap_1"
+
+class UknownEnemyError(Exception): pass
+
+
+class UknownTileTypeError(Exception): pass
+
+
+class InfiniteMapError(Exception): pass
+
+
+class InputState:
+    """The keys held down during a tick."""
+
+    __slots__ = ("up", "down", "left", "right", "god_mode")
+
+    def __init__(self, up=False, down=False, left=False, right=False, god_mode=False):
+        self.up = up
+        self.down = down
+        self.left = left
+        self.right = right
+        self.god_mode = god_mode
+
+    def copy(self):
+        return InputState(self.up, self.down, self.left, self.right, self.god_mode)
+
+    def __eq__(self, other):
+        if not isinstance(other, InputState):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        pressed = [name for name in self.__slots__ if getattr(self, name)]
+        return f"InputState({', '.join(pressed)})"
+
+
+class Simulation:
+    """
+    A running game, without a window.
+    :param str map_name: The map to load, from the tilemaps folder.
+    :param bool headless: Create the sprite lists lazily, so no OpenGL context is needed. They
+           are created on the GPU the first time they are drawn. A headless simulation plays no
+           sounds, unless it is given a mixer.
+    :param FrameProfiler profiler: The profiler to time the phases of each tick with.
+    :param sounds.Mixer mixer: The mixer to play sounds through. Defaults to sounds.MIXER, unless
+           the simulation is headless. Its short sound effects are decoded up front.
+    Attributes:
+        :mixer: The mixer sounds are played through, or None if the simulation is muted.
+        :input: The keys held down, read at the start of every tick.
+        :ticks: The number of ticks run since the simulation was created.
+        :deaths: The number of times the player was killed.
+    """
+
+    def __init__(
+        self,
+        map_name: str = MAP_NAME,
+        headless: bool = False,
+        profiler: Optional[FrameProfiler] = None,
+        mixer: Optional[sounds.Mixer] = None,
+    ):
+        self.map_name = map_name
+        self.headless = headless
+        self.profiler = profiler if profiler is not None else FrameProfiler()
+        if mixer is None and not headless:
+            mixer = sounds.MIXER
+        self.mixer = mixer
+        if mixer is not None:
+            mixer.preload()
+
+        self.dt = 1
+        self.tile_map = None
+        self.scene = None
+        self.player = None
+        self.physics_engine = None
+        self.collisions = None
+        self.enemy_physics = None
+        self.was_touching_jump_pads: list[arcade.Sprite] = list()
+        self.level_preloader = LevelPreloader()
+
+        self.input = InputState()
+        self.score = 0
+        self.level = 1
+        self.ticks = 0
+        self.deaths = 0
+
+    @property
+    def god_mode(self):
+        return self.input.god_mode
+
+    def _add_sprite_list(self, name: str, use_spatial_hash: bool):
+        sprite_list = arcade.SpriteList(use_spatial_hash=use_spatial_hash, lazy=self.headless)
+        self.scene.add_sprite_list(name, use_spatial_hash=use_spatial_hash, sprite_list=sprite_list)
+
+    def setup(self):
+        """Set up the level. Call this method to restart the level."""
+        # Load in the tiled map, unless it was already preloaded
+        self.tile_map = self.level_preloader.take(self.map_name)
+        if self.tile_map is None:
+            self.tile_map = load_level_tilemap(self.map_name, lazy=self.headless)
+
+        # The triggers, the collision grid and the enemy physics are all built from the sprites the
+        # map has now, while an infinite map only gets the sprites of its chunks as the camera moves
+        if self.tile_map.tiled_map.infinite:
+            raise InfiniteMapError(f"{self.map_name} is an infinite map, levels must be finite maps.")
+
+        # Initialize Scene with our TileMap, this will automatically add all layers
+        # from the map as SpriteLists in the scene in the proper order.
+        self.scene = arcade.Scene.from_tilemap(self.tile_map)
+
+        for layer in ALL_LAYERS:
+            if not self.scene.name_mapping.get(layer):
+                self._add_sprite_list(layer, LAYER_OPTIONS[layer]["use_spatial_hash"])
+
+        self._add_sprite_list(LADDERS_LAYER, True)
+        self._add_sprite_list(COINS_LAYER, True)
+        self._add_sprite_list(DANGER_LAYER, True)
+        self._add_sprite_list(GOAL_LAYER, True)
+        self._add_sprite_list(JUMP_PADS_LAYER, True)
+        self._add_sprite_list(PLAYER_LAYER, False)
+
+        for tile in self.scene[OBJECTS_LAYER]:
+            try:
+                ttype = tile.properties["type"]
+            except KeyError:
+                raise UknownTileTypeError()
+            for key in TYPES_TO_LAYER.keys():
+                if ttype in key:
+                    self.scene.add_sprite(name=TYPES_TO_LAYER[key], sprite=tile)
+
+        # Delete OBJECTS_LAYER. Since we have split all of the tiles in OBJECTS_LAYER into seperate spritelists, we have
+        # no more use for it.
+        self.scene.remove_sprite_list_by_name(OBJECTS_LAYER)
+
+        # Set up the player, specifically placing it at these coordinates.
+        self.player = PlayerSprite(self.mixer)
+        self.player.center_x = PLAYER_START_X
+        self.player.center_y = PLAYER_START_Y
+        self.scene.add_sprite(PLAYER_LAYER, self.player)
+
+        # All enemies are moved together, colliding with a grid of the platform tiles
+        self.enemy_physics = EnemyPhysics.from_sprite_lists(
+            TileSpriteGrid.from_tilemap(self.tile_map),
+            self.scene[PLATFORMS_LAYER],
+            self.scene[MOVING_PLATFORMS_LAYER],
+        )
+        self.add_enemies_to_scene()
+
+        # Only the layers the player can trigger something on are checked for collisions. Their tiles are looked up
+        # in a grid of the map's tiles.
+        self.collisions = CollisionDispatcher(TileSpriteGrid.from_tilemap(self.tile_map))
+        self.collisions.register(COINS_LAYER, self.scene[COINS_LAYER], self.on_coins_hit)
+        self.collisions.register(DANGER_LAYER, self.scene[DANGER_LAYER], self.on_dangers_hit)
+        self.collisions.register(GOAL_LAYER, self.scene[GOAL_LAYER], self.on_goal_hit)
+        self.collisions.register(JUMP_PADS_LAYER, self.scene[JUMP_PADS_LAYER], self.on_jump_pads_hit)
+
+        # Create the physics engine
+        self.physics_engine = arcade.PhysicsEnginePlatformer(
+            self.player,
+            gravity_constant=GRAVITY,
+            walls=self.scene[PLATFORMS_LAYER],
+            platforms=self.scene[MOVING_PLATFORMS_LAYER],
+            ladders=self.scene[LADDERS_LAYER]
+        )
+        self.player.register_one_physics_engine(self.physics_engine)
+
+        self.was_touching_jump_pads = list()
+        self.score = 0
+
+    def add_enemies_to_scene(self):
+        """Add enemies to the scene. Assumes that self.tile_map, self.scene and self.enemy_physics are already created."""
+        enemies_layer = self.tile_map.object_lists[ENEMIES_LAYER]
+        for enemy_object in enemies_layer:
+            # Checks if enemy_object has the "type" property
+            # If it does, then it is an enemy
+            # If it doesn't, it is just a point. A point is used by enemy objects to indicate specific coordinates, like
+            # boundaries.
+            enemy_type = enemy_object.properties.get("type")
+            if enemy_type is not None:
+                enemy_cartesian_pos = self.tile_map.get_cartesian(*enemy_object.shape)
+
+                if enemy_type in ("battle_bot", "missle_bot"):
+                    center_x = floor(enemy_cartesian_pos[0] * GRID_PIXEL_SIZE)
+                    center_y = floor((enemy_cartesian_pos[1] + 1) * GRID_PIXEL_SIZE)
+                    # The boundary properties are object references, looked up through the tilemap's object index.
+                    # The shapes of those objects are already scaled.
+                    boundary_left_obj = self.tile_map.get_object_by_id(enemy_object.properties["boundary_left"].id)
+                    boundary_right_obj = self.tile_map.get_object_by_id(enemy_object.properties["boundary_right"].id)
+                    boundary_left = boundary_left_obj.shape[0]
+                    boundary_right = boundary_right_obj.shape[0]
+
+                    kwargs = {
+                        "center_x": center_x,
+                        "center_y": center_y,
+                        "boundary_left": boundary_left,
+                        "boundary_right": boundary_right
+                    }
+
+                elif enemy_type == "drone_bot":
+                    raise NotImplementedError("drone_bot is not implemented into the game yet.")
+
+                elif enemy_type == "assassin_bot":
+                    raise NotImplementedError("assassin_bot is not implemented into the game yet.")
+
+                else:
+                    raise UknownEnemyError(f"Unknown enemy type: {enemy_type}.")
+
+                try:
+                    enemy = TYPES_TO_ENEMY[enemy_type](**kwargs)
+                except KeyError:
+                    raise UknownEnemyError(f"Unknown enemy type: {enemy_type}.")
+
+                self.scene.add_sprite(ENEMIES_LAYER, enemy)
+                self.enemy_physics.add(enemy)
+
+    def next_map_name(self) -> str:
+        """The map of the level after this one. Every level is played on the same map for now."""
+        return self.map_name
+
+    def is_near_goal(self) -> bool:
+        """Whether the player is within LEVEL_PRELOAD_DISTANCE of any goal tile."""
+        for goal in self.scene[GOAL_LAYER]:
+            distance_x = goal.center_x - self.player.center_x
+            distance_y = goal.center_y - self.player.center_y
+            if distance_x * distance_x + distance_y * distance_y < LEVEL_PRELOAD_DISTANCE * LEVEL_PRELOAD_DISTANCE:
+                return True
+        return False
+
+    def play_sound(self, sound: sounds.SoundEffect):
+        """Play a sound effect, unless the simulation is muted."""
+        if self.mixer is not None:
+            self.mixer.play(sound)
+
+    def kill_player(self):
+        """Resets the player's position and kills the player."""
+        self.player.stop()
+        self.player.center_x = PLAYER_START_X
+        self.player.center_y = PLAYER_START_Y
+        self.deaths += 1
+        self.play_sound(sounds.game_over_sound)
+
+    def on_coins_hit(self, hit_list: list[arcade.Sprite]):
+        # Better to do this than to play a sound for every single coin
+        self.play_sound(sounds.collect_coin_sound)
+        for coin in hit_list:
+            coin.remove_from_sprite_lists()
+            self.collisions.remove(coin)
+            self.score += 1
+
+    def on_dangers_hit(self, hit_list: list[arcade.Sprite]):
+        self.kill_player()
+
+    def on_goal_hit(self, hit_list: list[arcade.Sprite]):
+        # Advance to the next level
+        self.level += 1
+        # Load the next level
+        self.setup()
+        self.play_sound(sounds.goal_sound)
+        # The sprites hit this frame belong to the old level, so stop dispatching
+        return True
+
+    def on_jump_pads_hit(self, hit_list: list[arcade.Sprite]):
+        for jump_pad in hit_list:
+            if not jump_pad in self.was_touching_jump_pads:
+                # For consistency, we want the player to jump FROM THE TOP of the jump pad, instead of from
+                # their current y position.
+                # However, each type of jump pad has different heights.
+                # This means the player will jump at a different height, because it will jump from a different
+                # position, due to the different jump pad heights.
+                # Using this piece of code, we can get the height of the tile of the jump pad (which is
+                # always consistent), instead of the height of the jump pad itself.
+                jump_pad_cartesian_y = (self.tile_map.get_cartesian(jump_pad.center_x, jump_pad.center_y))[1]
+                self.player.bottom = jump_pad_cartesian_y * GRID_PIXEL_SIZE
+                if jump_pad.properties["type"] == "blue_jump_pad":
+                    self.player.change_y = BLUE_JUMP_PAD_BOOST_SPEED
+                    self.play_sound(sounds.blue_jump_pad_sound)
+                elif jump_pad.properties["type"] == "green_jump_pad":
+                    self.player.change_y = GREEN_JUMP_PAD_BOOST_SPEED
+                    self.play_sound(sounds.green_jump_pad_sound)
+                self.was_touching_jump_pads.append(jump_pad)
+
+    def tick(self, tick_time: float = 1 / TICK_RATE):
+        """Movement and game logic for one tick."""
+        self.dt = tick_time * TARGET_FPS
+        self.ticks += 1
+
+        with self.profiler.phase(PHASE_INPUT):
+            # If god mode is enabled, set gravity to 0. This will allow the player to fly around.
+            if self.god_mode:
+                self.physics_engine.gravity_constant = 0
+            else:
+                self.physics_engine.gravity_constant = GRAVITY
+
+            self.player.set_physics_state(
+                up_pressed=self.input.up,
+                down_pressed=self.input.down,
+                right_pressed=self.input.right,
+                left_pressed=self.input.left,
+                god_mode=self.god_mode
+            )
+
+        with self.profiler.phase(PHASE_COLLISIONS):
+            for jump_pad in self.was_touching_jump_pads:
+                if not arcade.check_for_collision(self.player, jump_pad):
+                    self.was_touching_jump_pads.remove(jump_pad)
+
+            if self.player.center_y < -500:
+                self.kill_player()
+
+            self.collisions.dispatch(self.player)
+
+            # Start loading the next level in the background once the player gets near the goal
+            if self.level_preloader.requested is None and self.is_near_goal():
+                self.level_preloader.request(self.next_map_name())
+
+        # Updating the scene runs the player's movement logic, and the enemies' timers
+        with self.profiler.phase(PHASE_PLAYER_PHYSICS):
+            self.scene.on_update(delta_time=self.dt)
+        with self.profiler.phase(PHASE_ANIMATION):
+            # The sprites of plain tile layers don't animate themselves, the tilemap's animation clips
+            # animate their tiles with a clock per tile instead
+            plain_tile_layers = self.tile_map.plain_tile_layers
+            self.scene.update_animation(
+                delta_time=self.dt,
+                names=[name for name in self.scene.name_mapping if name not in plain_tile_layers],
+            )
+            # Unlike dt, the clips take the time in seconds
+            self.tile_map.update_animations(tick_time)
+
+        # Update physics on everything
+        with self.profiler.phase(PHASE_PLAYER_PHYSICS):
+            self.physics_engine.update()
+        with self.profiler.phase(PHASE_ENEMY_PHYSICS):
+            self.enemy_physics.update()
+
+    def run(self, ticks: int, inputs: Optional[Iterable[InputState]] = None):
+        """
+        Run a number of ticks as fast as possible.
+        :param int ticks: How many ticks to run.
+        :param Iterable[InputState] inputs: The input of each tick. Once it runs out, no keys are held.
+        """
+        inputs = iter(inputs if inputs is not None else ())
+        for _ in range(ticks):
+            self.input = next(inputs, None) or InputState()
+            self.tick()
+            self.profiler.end_frame()
+
+
+def walk_and_jump(ticks: int, jump_every: int = 90, jump_length: int = 20) -> Iterable[InputState]:
+    """A scripted input that holds right and jumps at a regular interval."""
+    for tick in range(ticks):
+        yield InputState(right=True, up=tick % jump_every < jump_length)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Run a level headless, with scripted input.")
+    arg_parser.add_argument("map_name", nargs="?", default=MAP_NAME, help="A map in the tilemaps folder")
+    arg_parser.add_argument("--ticks", type=int, default=10000, help="How many ticks to run")
+    args = arg_parser.parse_args()
+
+    simulation = Simulation(args.map_name, headless=True)
+    start = perf_counter()
+    simulation.setup()
+    setup_time = perf_counter() - start
+
+    start = perf_counter()
+    simulation.run(args.ticks, walk_and_jump(args.ticks))
+    run_time = perf_counter() - start
+
+    print(f"{args.map_name}: set up in {setup_time * 1000:.1f} ms")
+    print(f"{args.ticks} ticks in {run_time:.2f} s, {args.ticks / run_time:.0f} ticks per second")
+    print(f"Score {simulation.score}, level {simulation.level}, deaths {simulation.deaths}")
+    print(f"Player at ({simulation.player.center_x:.1f}, {simulation.player.center_y:.1f})")
+    for phase, (p50, p95, p99) in simulation.profiler.percentiles().items():
+        print(f"{phase:<16}p50 {p50 * 1000:7.3f} ms  p95 {p95 * 1000:7.3f} ms  p99 {p99 * 1000:7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,204 @@
-from arcade import load_sound
-collect_coin_sound = load_sound(":resources:sounds/coin1.wav")
-jump_sound = load_sound(":resources:sounds/jump1.wav")
-game_over_sound = load_sound(":resources:sounds/gameover1.wav")
-goal_sound = load_sound(":resources:sounds/upgrade4.wav")
-blue_jump_pad_sound = load_sound(":resources:sounds/upgrade1.wav")
-green_jump_pad_sound = load_sound(":resources:sounds/gameover2.wav")
\ No newline at end of file
+"""
+The game's sound effects, played through a mixer with a fixed pool of reusable voices.
+
+Every effect has a cooldown and a limit on how many voices it can play on at once, so a
+burst like collecting a trail of coins or bouncing between jump pads plays a few sounds
+instead of one per event. Once every voice is busy, the voice that started playing
+earliest is stolen. Short effects are decoded when the game starts, and other effects on a
+background thread right after, so playing an effect never decodes it on the main thread.
+"""
+
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import arcade
+import pyglet
+
+from constants import SOUND_VOICES
+
+
+class SoundEffect:
+    """
+    A sound effect and how it is mixed.
+    :param str file_name: The sound file.
+    :param float cooldown: How long after it was played it can't be played again, in seconds.
+    :param int max_voices: How many voices it can play on at once.
+    :param float volume: The volume, from 0 to 1.
+    :param bool preload: Whether to decode it when the game starts, for short effects. Other
+           effects are decoded in the background.
+    Attributes:
+        :sound: The decoded sound, once it was loaded.
+        :loading: The background decoding of the sound, while it runs.
+        :last_played: When it was last played, by the mixer's clock.
+    """
+
+    def __init__(self, file_name: str, cooldown: float = 0.05, max_voices: int = 2, volume: float = 1.0,
+                 preload: bool = True):
+        self.file_name = file_name
+        self.cooldown = cooldown
+        self.max_voices = max_voices
+        self.volume = volume
+        self.preload = preload
+        self.sound: Optional[arcade.Sound] = None
+        self.loading: Optional[Future] = None
+        self.last_played: Optional[float] = None
+
+    def __repr__(self):
+        return f"SoundEffect({self.file_name!r})"
+
+
+class Voice:
+    """
+    A pyglet player that plays one effect at a time, and is reused for the next one.
+    Attributes:
+        :effect: The effect it is playing, or last played.
+        :ends_at: When the effect it is playing ends, by the mixer's clock.
+    """
+
+    def __init__(self):
+        self.player = pyglet.media.Player()
+        self.effect: Optional[SoundEffect] = None
+        self.started_at = 0.0
+        self.ends_at = 0.0
+
+    def is_busy(self, now: float) -> bool:
+        return now < self.ends_at
+
+    def play(self, effect: SoundEffect, now: float):
+        """Play an effect, cutting off whatever the voice was playing."""
+        player = self.player
+        if player.source is not None:
+            player.pause()
+            player.next_source()
+        player.queue(effect.sound.source)
+        player.volume = effect.volume
+        player.play()
+        self.effect = effect
+        self.started_at = now
+        self.ends_at = now + effect.sound.get_length()
+
+    def stop(self):
+        if self.player.source is not None:
+            self.player.pause()
+            self.player.next_source()
+        self.ends_at = 0.0
+
+
+class Mixer:
+    """
+    Plays sound effects on a fixed pool of voices. The voices are created by preload(), or
+    when the first sound is played if the mixer wasn't preloaded.
+    :param int voice_count: How many voices to play sounds on.
+    :param Callable[[], float] clock: The time in seconds, that cooldowns are measured with.
+    Attributes:
+        :plays: How many effects were played.
+        :loads: How many effects were decoded, on the main thread or in the background.
+        :cooled_down: How many plays were dropped because the effect was played too recently.
+        :steals: How many plays cut off a voice that was still playing.
+    """
+
+    def __init__(self, voice_count: int = SOUND_VOICES, clock: Callable[[], float] = time.perf_counter):
+        self.voice_count = voice_count
+        self.clock = clock
+        self.effects: List[SoundEffect] = []
+        self.voices: List[Voice] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.plays = 0
+        self.loads = 0
+        self.cooled_down = 0
+        self.steals = 0
+
+    def add(self, *args, **kwargs) -> SoundEffect:
+        """Add an effect, taking the arguments of SoundEffect. Effects to preload are decoded by preload()."""
+        effect = SoundEffect(*args, **kwargs)
+        self.effects.append(effect)
+        return effect
+
+    def load(self, effect: SoundEffect) -> arcade.Sound:
+        """Decode an effect, if it wasn't yet, or wait for it to finish decoding in the background."""
+        if effect.sound is None:
+            if effect.loading is not None:
+                effect.sound = effect.loading.result()
+                effect.loading = None
+            else:
+                self.loads += 1
+                effect.sound = arcade.load_sound(effect.file_name)
+        return effect.sound
+
+    def preload(self):
+        """
+        Decode the effects to preload, start decoding the other effects in the background, and
+        create the voices.
+        """
+        for effect in self.effects:
+            if effect.preload:
+                self.load(effect)
+            elif effect.sound is None and effect.loading is None:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sound-loader")
+                self.loads += 1
+                effect.loading = self._executor.submit(arcade.load_sound, effect.file_name)
+        self._create_voices()
+
+    def _create_voices(self):
+        while len(self.voices) < self.voice_count:
+            self.voices.append(Voice())
+
+    def _find_voice(self, effect: SoundEffect, now: float) -> Voice:
+        """
+        The voice to play an effect on: the earliest started voice of the effect once it plays
+        on as many voices as it may, otherwise an idle voice, otherwise the earliest started voice.
+        """
+        own_voices = [voice for voice in self.voices if voice.effect is effect and voice.is_busy(now)]
+        if len(own_voices) >= effect.max_voices:
+            return min(own_voices, key=lambda voice: voice.started_at)
+        for voice in self.voices:
+            if not voice.is_busy(now):
+                return voice
+        return min(self.voices, key=lambda voice: voice.started_at)
+
+    def play(self, effect: SoundEffect) -> bool:
+        """Play an effect, unless it is cooling down. Returns whether it was played."""
+        now = self.clock()
+        if effect.last_played is not None and now - effect.last_played < effect.cooldown:
+            self.cooled_down += 1
+            return False
+
+        self.load(effect)
+        self._create_voices()
+        voice = self._find_voice(effect, now)
+        if voice.is_busy(now):
+            self.steals += 1
+        voice.play(effect, now)
+        effect.last_played = now
+        self.plays += 1
+        return True
+
+    def stop(self):
+        """Stop every voice."""
+        for voice in self.voices:
+            voice.stop()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """The counters, and how many voices are playing."""
+        now = self.clock()
+        return {
+            "plays": self.plays,
+            "loads": self.loads,
+            "cooled_down": self.cooled_down,
+            "steals": self.steals,
+            "busy_voices": sum(voice.is_busy(now) for voice in self.voices),
+        }
+
+
+MIXER = Mixer()
+
+collect_coin_sound = MIXER.add(":resources:sounds/coin1.wav", cooldown=0.03, max_voices=3)
+jump_sound = MIXER.add(":resources:sounds/jump1.wav", cooldown=0.05, max_voices=2)
+blue_jump_pad_sound = MIXER.add(":resources:sounds/upgrade1.wav", cooldown=0.15, max_voices=1)
+green_jump_pad_sound = MIXER.add(":resources:sounds/gameover2.wav", cooldown=0.15, max_voices=1)
+# Longer effects that play once in a while are decoded in the background
+game_over_sound = MIXER.add(":resources:sounds/gameover1.wav", cooldown=0.5, max_voices=1, preload=False)
+goal_sound = MIXER.add(":resources:sounds/upgrade4.wav", cooldown=0.5, max_voices=1, preload=False)
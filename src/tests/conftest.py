@@ -0,0 +1,16 @@
+"""Lets the tests import the game's modules, and run from the project root like the game does."""
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+PROJECT_ROOT = SRC_DIR.parent
+
+sys.path.insert(0, str(SRC_DIR))
+
+
+@pytest.fixture(autouse=True)
+def project_root(monkeypatch):
+    # Asset paths like "src/assets/images" are relative to the project root
+    monkeypatch.chdir(PROJECT_ROOT)
@@ -0,0 +1,41 @@
+"""Tests for the custom tilemap"""
+import pytest
+
+pytest.importorskip("arcade")
+
+from arcade import AnimationKeyframe
+
+from constants import TICK_RATE
+from custom_tilemap import AnimationClip
+from simulation import MAP_NAME, Simulation
+
+
+def make_clip(*durations: int) -> AnimationClip:
+    return AnimationClip([AnimationKeyframe(index, duration, None) for index, duration in enumerate(durations)])
+
+
+def test_animation_clip_advances_by_real_time():
+    clip = make_clip(100, 200, 100)
+
+    assert not clip.update(0.05)
+    assert clip.frame_index == 0
+    assert clip.update(0.06)
+    assert clip.frame_index == 1
+    assert clip.update(0.2)
+    assert clip.frame_index == 2
+    # The clip loops after 400 ms
+    assert clip.update(0.1)
+    assert clip.frame_index == 0
+    assert clip.time == pytest.approx(10)
+
+
+def test_simulation_ticks_advance_clips_by_tick_time():
+    simulation = Simulation(MAP_NAME, headless=True)
+    simulation.setup()
+    clip = simulation.tile_map.animation_clips[(0, 0)] = make_clip(100, 100)
+
+    ticks = 9
+    simulation.run(ticks)
+
+    assert clip.time == pytest.approx(ticks * 1000 / TICK_RATE)
+    assert clip.frame_index == 1
@@ -0,0 +1,36 @@
+"""Tests for the hit box cache"""
+import pytest
+
+pytest.importorskip("arcade")
+
+import PIL.Image
+
+from custom_tilemap import TileTextureCache
+from hit_box_cache import HitBoxCache, prewarm
+
+
+@pytest.fixture
+def tile_image(tmp_path):
+    image = PIL.Image.new("RGBA", (16, 16), (0, 0, 0, 0))
+    image.paste((255, 0, 0, 255), (4, 0, 12, 16))
+    image_file = tmp_path / "images" / "tile.png"
+    image_file.parent.mkdir()
+    image.save(image_file)
+    return image_file
+
+
+def test_prewarmed_tile_texture_is_a_hit(tmp_path, tile_image):
+    hit_boxes = HitBoxCache(tmp_path / "hit_boxes.json")
+    prewarm(tile_image.parent, hit_boxes, hit_box_algorithms=("Simple",))
+    prewarmed = len(hit_boxes)
+
+    # Tiles of image collection tilesets are cut from their image with its full size
+    TileTextureCache(hit_boxes=hit_boxes).get_texture(tile_image, 0, 0, 16, 16)
+
+    assert hit_boxes.hits == 1
+    assert len(hit_boxes) == prewarmed
+
+
+def test_part_of_an_image_is_not_the_whole_image(tile_image):
+    assert HitBoxCache.get_key(tile_image, 0, 0, 16, 16) == HitBoxCache.get_key(tile_image)
+    assert HitBoxCache.get_key(tile_image, 0, 0, 8, 16) != HitBoxCache.get_key(tile_image)
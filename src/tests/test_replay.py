@@ -0,0 +1,40 @@
+"""Tests for recording and replaying games"""
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("arcade")
+
+from replay import Replay, play, record_script
+from simulation import MAP_NAME, walk_and_jump
+
+REPLAYS_DIR = Path(__file__).parent / "replays"
+# Record it again from the project root after a change that is meant to alter the game:
+#     python src/replay.py record src/tests/replays/basic_tilemap_1.bin basic_tilemap_1 --ticks 1200
+RECORDED_REPLAY = REPLAYS_DIR / f"{MAP_NAME}.bin"
+
+
+def test_recorded_replay_matches():
+    # A missing replay fails, so the regression test can't silently stop running
+    assert RECORDED_REPLAY.exists(), f"{RECORDED_REPLAY} is missing, record it with the command above"
+    replay = Replay.load(str(RECORDED_REPLAY))
+
+    result = play(replay)
+
+    assert replay.checkpoints
+    assert result.simulation.ticks == len(replay)
+    assert result.mismatches == []
+
+
+def test_replay_round_trip(tmp_path):
+    replay = record_script(MAP_NAME, walk_and_jump(600))
+    replay_file = tmp_path / "replay.bin"
+    replay.save(str(replay_file))
+
+    loaded = Replay.load(str(replay_file))
+    result = play(loaded)
+
+    assert loaded.inputs == replay.inputs
+    assert loaded.checkpoints == replay.checkpoints
+    assert len(loaded.checkpoints) == 10
+    assert result.mismatches == []
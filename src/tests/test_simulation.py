@@ -0,0 +1,39 @@
+"""Tests for running the simulation headless"""
+import pytest
+
+pytest.importorskip("arcade")
+
+from constants import PLAYER_START_X, PLAYER_START_Y
+from simulation import MAP_NAME, Simulation, walk_and_jump
+
+TICKS = 600
+
+
+def run_headless(ticks: int) -> Simulation:
+    simulation = Simulation(MAP_NAME, headless=True)
+    simulation.setup()
+    simulation.run(ticks, walk_and_jump(ticks))
+    return simulation
+
+
+def test_headless_run():
+    simulation = run_headless(TICKS)
+
+    assert simulation.ticks == TICKS
+    assert simulation.level == 1
+    assert (simulation.player.center_x, simulation.player.center_y) != (PLAYER_START_X, PLAYER_START_Y)
+    assert simulation.mixer is None
+
+
+def test_headless_runs_are_deterministic():
+    first = run_headless(TICKS)
+    second = run_headless(TICKS)
+
+    assert (first.player.center_x, first.player.center_y) == (second.player.center_x, second.player.center_y)
+    assert (first.score, first.deaths, first.level) == (second.score, second.deaths, second.level)
+
+
+def test_headless_simulation_does_not_mute_others():
+    run_headless(1)
+
+    assert Simulation(MAP_NAME, headless=False).mixer is not None
@@ -0,0 +1,124 @@
+"""
+A fixed timestep for the game simulation, decoupled from the frame rate.
+
+Every frame, the time since the last frame is added to an accumulator, and the simulation
+is ticked once for every whole tick that fits in it. A slow frame is caught up with extra
+ticks, up to a limit so a long hitch doesn't freeze the game while it catches up. The time
+left over in the accumulator is used to draw moving sprites between their last two ticks.
+"""
+
+from collections import deque
+from time import perf_counter
+from typing import Callable, Iterable, List, Tuple
+
+import arcade
+
+from constants import MAX_TICKS_PER_FRAME, TICK_RATE
+
+
+class TimingStats:
+    """
+    Keeps the most recent durations of something, in seconds.
+    :param int window: How many durations to keep.
+    """
+
+    def __init__(self, window: int = 120):
+        self.durations = deque(maxlen=window)
+
+    def add(self, duration: float):
+        self.durations.append(duration)
+
+    @property
+    def average(self) -> float:
+        return sum(self.durations) / len(self.durations) if self.durations else 0.0
+
+    @property
+    def maximum(self) -> float:
+        return max(self.durations, default=0.0)
+
+    def __repr__(self):
+        return f"TimingStats(average={self.average * 1000:.2f}ms, maximum={self.maximum * 1000:.2f}ms)"
+
+
+class FixedTimestep:
+    """
+    Runs a tick function at a fixed rate, however often it is given frames.
+    :param float tick_rate: The ticks per second.
+    :param int max_ticks: The most ticks to run in one frame. Time beyond that is dropped.
+    Attributes:
+        :tick_stats: How long the recent ticks took to run.
+        :frame_stats: The recent frame times, which are the time between frames.
+        :ticks: The number of ticks run so far.
+        :dropped_time: The time in seconds that was dropped to keep up.
+    """
+
+    def __init__(self, tick_rate: float = TICK_RATE, max_ticks: int = MAX_TICKS_PER_FRAME):
+        self.tick_time = 1 / tick_rate
+        self.max_ticks = max_ticks
+        self.accumulator = 0.0
+        self.ticks = 0
+        self.dropped_time = 0.0
+        self.tick_stats = TimingStats()
+        self.frame_stats = TimingStats()
+
+    @property
+    def alpha(self) -> float:
+        """How far the current time is between the last tick and the next one, from 0 to 1."""
+        return self.accumulator / self.tick_time
+
+    def run(self, delta_time: float, tick: Callable[[float], None]) -> int:
+        """
+        Add the time of a frame, and run as many ticks as are due. Returns the number of ticks run.
+        :param float delta_time: The time since the last frame, in seconds.
+        :param Callable[[float], None] tick: Called with the tick time, once for every tick.
+        """
+        self.frame_stats.add(delta_time)
+        self.accumulator += delta_time
+        ticks = int(self.accumulator / self.tick_time)
+        if ticks > self.max_ticks:
+            dropped_time = (ticks - self.max_ticks) * self.tick_time
+            self.dropped_time += dropped_time
+            self.accumulator -= dropped_time
+            ticks = self.max_ticks
+        self.accumulator -= ticks * self.tick_time
+
+        for _ in range(ticks):
+            start = perf_counter()
+            tick(self.tick_time)
+            self.tick_stats.add(perf_counter() - start)
+        self.ticks += ticks
+        return ticks
+
+
+class PositionInterpolator:
+    """
+    Draws sprites between their positions of the last two ticks, so their movement looks
+    smooth when the frame rate and tick rate don't match.
+    """
+
+    def __init__(self):
+        # The sprites with their positions at the start of the last tick
+        self._previous: List[Tuple[arcade.Sprite, float, float]] = []
+        # The sprites with their real positions, while they are moved for drawing
+        self._current: List[Tuple[arcade.Sprite, float, float]] = []
+
+    def snapshot(self, sprites: Iterable[arcade.Sprite]):
+        """Remember the positions of sprites. Call this before every tick."""
+        self._previous = [(sprite, sprite.center_x, sprite.center_y) for sprite in sprites]
+
+    def apply(self, alpha: float):
+        """Move the sprites to where they are drawn. Call restore() once they are drawn."""
+        self._current = []
+        for sprite, previous_x, previous_y in self._previous:
+            current_x = sprite.center_x
+            current_y = sprite.center_y
+            self._current.append((sprite, current_x, current_y))
+            sprite.center_x = previous_x + (current_x - previous_x) * alpha
+            sprite.center_y = previous_y + (current_y - previous_y) * alpha
+
+    def restore(self):
+        """Move the sprites back to their real positions."""
+        for sprite, current_x, current_y in self._current:
+            sprite.center_x = current_x
+            sprite.center_y = current_y
+        self._current = []
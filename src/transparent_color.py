@@ -0,0 +1,61 @@
+"""
+Keying a transparent color out of images, like Tiled does for image layers with a
+transparent color, cached on disk.
+
+The color is keyed out with PIL channel operations instead of a Python loop over every
+pixel. The keyed image is saved under the content hash of the original image and the key
+color, so each image is only keyed once, and editing the image keys it again.
+"""
+
+import os
+from pathlib import Path
+from typing import Sequence, Union
+
+import PIL.Image
+import PIL.ImageChops
+
+from constants import KEYED_IMAGE_CACHE_DIR
+from hit_box_cache import hash_image_file
+
+# Keyed out pixels become transparent white, like arcade does
+KEYED_PIXEL = (255, 255, 255, 0)
+
+
+def key_transparent_color(image: PIL.Image.Image, color: Sequence[int]) -> PIL.Image.Image:
+    """Return a copy of an image with every pixel of a color made transparent. The alpha of the color is ignored."""
+    image = image.convert("RGBA")
+    red, green, blue, _ = image.split()
+    # A mask that is 255 where a channel matches, so multiplying the masks leaves 255 where every channel matches
+    mask = None
+    for channel, value in zip((red, green, blue), color[:3]):
+        channel_mask = channel.point(lambda pixel, value=value: 255 if pixel == value else 0)
+        mask = channel_mask if mask is None else PIL.ImageChops.multiply(mask, channel_mask)
+
+    keyed = image.copy()
+    keyed.paste(KEYED_PIXEL, mask=mask)
+    return keyed
+
+
+def load_keyed_image(
+    image_file: Union[str, Path],
+    color: Sequence[int],
+    cache_dir: Union[str, Path] = KEYED_IMAGE_CACHE_DIR,
+) -> PIL.Image.Image:
+    """Load an image with a transparent color keyed out, from the cache if it was keyed before."""
+    red, green, blue = color[:3]
+    cache_file = Path(cache_dir, f"{hash_image_file(image_file)}-{red:02x}{green:02x}{blue:02x}.png")
+    if cache_file.exists():
+        keyed = PIL.Image.open(cache_file)
+        keyed.load()
+        return keyed
+
+    with PIL.Image.open(image_file) as image:
+        keyed = key_transparent_color(image, color)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        temp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        keyed.save(temp_file, format="PNG")
+        os.replace(temp_file, cache_file)
+    except OSError as error:
+        print(f"Warning, can't write keyed image cache file {cache_file}: {error}")
+    return keyed
@@ -0,0 +1,201 @@
+"""
+Streaming the maps of a Tiled world in and out around a point, like the player or camera.
+
+A world file only lists its maps with their positions and sizes, so the whole world can be
+laid out without loading any map. Maps within the load radius are parsed and built into
+CustomTileMaps on a worker thread, so loading never stalls a frame, and maps beyond the
+evict radius are dropped, so memory stays bounded however large the world is.
+
+The worker creates its sprite lists lazily, since OpenGL can only be used from the main
+thread. They are created on the GPU the first time they are drawn.
+
+Stream the demo world headless from the project root, flying across it:
+
+    python src/world_streaming.py [world file] [--radius 600]
+"""
+
+import argparse
+import math
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import pytiled_parser
+from pyglet.math import Vec2
+
+import asset_atlas
+import custom_tilemap
+import hit_box_cache
+import map_cache
+from constants import TILE_SCALING, WORLD_EVICT_RADIUS, WORLD_LOAD_RADIUS
+
+
+class StreamedMap:
+    """
+    A map of the world, and its loading state.
+    Attributes:
+        :world_map: The map's entry in the world file.
+        :bounds: The (left, bottom, right, top) of the map in the game's pixel coordinates.
+        :tile_map: The loaded map, or None if it isn't loaded.
+        :future: The pending load of the map, if it is being loaded.
+    """
+
+    def __init__(self, world_map: pytiled_parser.WorldMap, scaling: float):
+        self.world_map = world_map
+        # Tiled worlds have y pointing down from the top left, the game has y pointing up
+        left = world_map.coordinates.x * scaling
+        top = -world_map.coordinates.y * scaling
+        self.bounds = (
+            left,
+            top - world_map.size.height * scaling,
+            left + world_map.size.width * scaling,
+            top,
+        )
+        self.tile_map: Optional[custom_tilemap.CustomTileMap] = None
+        self.future: Optional[Future] = None
+
+    @property
+    def name(self) -> str:
+        return self.world_map.map_file.stem
+
+    def distance_to(self, x: float, y: float) -> float:
+        """The distance from a point to the nearest edge of the map, or 0 if the point is on it."""
+        left, bottom, right, top = self.bounds
+        return math.hypot(max(left - x, 0, x - right), max(bottom - y, 0, y - top))
+
+
+class WorldStreamer:
+    """
+    Keeps the maps of a world near a point loaded.
+    Call update() every frame with the point to stream around. It starts loading maps that
+    came within the load radius, picks up the maps that finished loading, and evicts maps
+    that went beyond the evict radius. The evict radius should be larger than the load
+    radius, so a map isn't reloaded over and over by moving back and forth across its edge.
+    :param Union[str, Path] world_file: The Tiled world file.
+    :param float scaling: The scaling of the maps.
+    :param Dict[str, Dict[str, Any]] layer_options: Layer specific options for the maps,
+           see CustomTileMap.
+    :param float load_radius: How close the point has to come to a map for it to be loaded.
+    :param float evict_radius: How far the point has to go from a map for it to be evicted.
+    Attributes:
+        :loaded: The loaded maps, by map name.
+        :stats: How many maps were loaded and evicted, and how long loading took in total.
+    """
+
+    def __init__(
+        self,
+        world_file: Union[str, Path],
+        scaling: float = TILE_SCALING,
+        layer_options: Optional[Dict[str, Dict[str, Any]]] = None,
+        load_radius: float = WORLD_LOAD_RADIUS,
+        evict_radius: float = WORLD_EVICT_RADIUS,
+    ):
+        if evict_radius < load_radius:
+            raise ValueError("The evict radius can't be smaller than the load radius.")
+        self.world = pytiled_parser.parse_world(Path(os.path.normpath(world_file)))
+        self.scaling = scaling
+        self.layer_options = layer_options
+        self.load_radius = load_radius
+        self.evict_radius = evict_radius
+        self.maps = [StreamedMap(world_map, scaling) for world_map in self.world.maps]
+        self.loaded: Dict[str, custom_tilemap.CustomTileMap] = {}
+        self.stats = {"loads": 0, "evictions": 0, "load_seconds": 0.0}
+
+        # Textures are only touched by the worker thread, so it gets its own cache
+        self._texture_cache = custom_tilemap.TileTextureCache(asset_atlas.DEFAULT_ATLAS, hit_box_cache.DEFAULT_CACHE)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="world-streaming")
+
+    def _load(self, streamed_map: StreamedMap) -> Tuple[custom_tilemap.CustomTileMap, float]:
+        """Parse and build a map. This runs on the worker thread."""
+        start = time.perf_counter()
+        left, bottom, _, _ = streamed_map.bounds
+        tile_map = custom_tilemap.load_tilemap(
+            streamed_map.world_map.map_file,
+            self.scaling,
+            self.layer_options,
+            offset=Vec2(left, bottom),
+            lazy=True,
+            texture_cache=self._texture_cache,
+            tiled_map=map_cache.load_map(streamed_map.world_map.map_file),
+        )
+        return tile_map, time.perf_counter() - start
+
+    def update(self, x: float, y: float) -> Tuple[List[StreamedMap], List[StreamedMap]]:
+        """
+        Stream the maps around a point. Returns the maps that were loaded and the maps that
+        were evicted since the last update.
+        """
+        loaded = []
+        evicted = []
+        for streamed_map in self.maps:
+            distance = streamed_map.distance_to(x, y)
+
+            if streamed_map.future is not None and streamed_map.future.done():
+                future = streamed_map.future
+                streamed_map.future = None
+                # A failed load raises here, on the main thread
+                streamed_map.tile_map, load_seconds = future.result()
+                self.loaded[streamed_map.name] = streamed_map.tile_map
+                self.stats["loads"] += 1
+                self.stats["load_seconds"] += load_seconds
+                loaded.append(streamed_map)
+
+            if distance <= self.load_radius:
+                if streamed_map.tile_map is None and streamed_map.future is None:
+                    streamed_map.future = self._executor.submit(self._load, streamed_map)
+            elif distance > self.evict_radius:
+                if streamed_map.future is not None and streamed_map.future.cancel():
+                    streamed_map.future = None
+                if streamed_map.tile_map is not None:
+                    streamed_map.tile_map = None
+                    del self.loaded[streamed_map.name]
+                    self.stats["evictions"] += 1
+                    evicted.append(streamed_map)
+        return loaded, evicted
+
+    @property
+    def pending(self) -> int:
+        """The number of maps waiting to be loaded, or being loaded."""
+        return sum(streamed_map.future is not None for streamed_map in self.maps)
+
+    def close(self):
+        """Stop the worker thread, dropping any maps that haven't started loading."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Stream a world headless, flying across it.")
+    arg_parser.add_argument(
+        "world_file", nargs="?", default="src/assets/tilemap_project/tilemaps/demo.world", help="A Tiled world file"
+    )
+    arg_parser.add_argument("--radius", type=float, default=WORLD_LOAD_RADIUS, help="The load radius")
+    arg_parser.add_argument("--speed", type=float, default=40, help="Pixels flown per frame")
+    args = arg_parser.parse_args()
+
+    streamer = WorldStreamer(args.world_file, load_radius=args.radius, evict_radius=args.radius * 1.5)
+    left = min(streamed_map.bounds[0] for streamed_map in streamer.maps)
+    right = max(streamed_map.bounds[2] for streamed_map in streamer.maps)
+    y = sum(streamed_map.bounds[1] + streamed_map.bounds[3] for streamed_map in streamer.maps) / len(streamer.maps) / 2
+
+    worst_update = 0.0
+    x = left
+    while x <= right or streamer.pending:
+        start = time.perf_counter()
+        loaded, evicted = streamer.update(x, y)
+        worst_update = max(worst_update, time.perf_counter() - start)
+        for streamed_map in loaded:
+            print(f"x={x:7.0f}: loaded {streamed_map.name}")
+        for streamed_map in evicted:
+            print(f"x={x:7.0f}: evicted {streamed_map.name}")
+        x += args.speed
+        time.sleep(1 / 60)
+    streamer.close()
+
+    print(f"{streamer.stats['loads']} loads taking {streamer.stats['load_seconds']:.2f} s on the worker, "
+          f"{streamer.stats['evictions']} evictions, slowest update {worst_update * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()